@@ -46,18 +46,6 @@ class Api:
             
             result = subprocess.run(cmd, capture_output=True, text=True, env=env, cwd=current_dir)
             
-            # Se falhar como módulo, tenta como script direto
-            if result.returncode != 0 and "No module named" in (result.stderr or ''):
-                print("[DEBUG] Tentativa como módulo falhou, tentando como script direto...")
-                cmd = [
-                    sys.executable, 'back_end/main_cli.py',
-                    '--input', temp_file_path,
-                    '--output', DATA_OUTPUT_DIR,
-                    '--diagram-name', diagram_name,
-                    '--language', language
-                ]
-                result = subprocess.run(cmd, capture_output=True, text=True, env=env, cwd=current_dir)
-            
             # Debug: Imprime informações sobre o comando executado
             print(f"[DEBUG] Comando executado: {' '.join(cmd)}")
             print(f"[DEBUG] Python utilizado: {sys.executable}")
@@ -19,8 +19,7 @@ class MainCodeGenerator:
     def __init__(self, parsed_diagram: PlantUMLDiagrama, output_base_dir: str, diagram_name: str = None, base_namespace: str = "GeneratedCode"):
         # Cria subpasta numerada
         base_dir = output_base_dir
-        if not os.path.exists(base_dir):
-            os.makedirs(base_dir)
+        os.makedirs(base_dir, exist_ok=True)
         
         # Usa o nome do diagrama se fornecido, senão padrão "Diagrama"
         if diagram_name:
@@ -31,12 +30,17 @@ class MainCodeGenerator:
         # Garante unicidade: se já existe, incrementa _2, _3, ...
         nome_final = base_name
         i = 1
-        while os.path.exists(os.path.join(base_dir, nome_final)):
-            i += 1
-            nome_final = f"{base_name}_{i}"
+        # os.mkdir (sem exist_ok) reserva a pasta: se ela já existe, ou se outro
+        # processo a criou ao mesmo tempo, tenta o próximo sufixo
+        while True:
+            try:
+                os.mkdir(os.path.join(base_dir, nome_final))
+                break
+            except FileExistsError:
+                i += 1
+                nome_final = f"{base_name}_{i}"
         
         self.output_base_dir = os.path.join(base_dir, nome_final)
-        os.makedirs(self.output_base_dir, exist_ok=True)
         
         self.parsed_diagram: PlantUMLDiagrama = parsed_diagram
         self.base_namespace: str = base_namespace
@@ -8,7 +8,7 @@ from back_end.plantuml_parser.data_structures import (
     PlantUMLDiagrama, PlantUMLClasse, PlantUMLEnum, PlantUMLInterface, PlantUMLPacote
 )
 
-from .type_mapper import TypeMapper
+from .type_mapper import TypeMapper, DEFAULT_TYPE_MAPPER
 from .import_manager import ImportManager
 from .structure_generators import ClassGenerator, EnumGenerator, InterfaceGenerator
 from .utils import sanitize_name_for_java, to_camel_case, to_pascal_case
@@ -19,8 +19,7 @@ class MainCodeGenerator:
     def __init__(self, parsed_diagram: PlantUMLDiagrama, output_base_dir: str, diagram_name: str = None, base_package: str = "generatedcode"):
         # Cria subpasta numerada
         base_dir = output_base_dir
-        if not os.path.exists(base_dir):
-            os.makedirs(base_dir)
+        os.makedirs(base_dir, exist_ok=True)
 
         # Usa o nome do diagrama se fornecido, senão padrão "Diagrama"
         if diagram_name:
@@ -30,12 +29,17 @@ class MainCodeGenerator:
 
         nome_final = base_name
         i = 1
-        while os.path.exists(os.path.join(base_dir, nome_final)):
-            i += 1
-            nome_final = f"{base_name}_{i}"
+        # os.mkdir (sem exist_ok) reserva a pasta: se ela já existe, ou se outro
+        # processo a criou ao mesmo tempo, tenta o próximo sufixo
+        while True:
+            try:
+                os.mkdir(os.path.join(base_dir, nome_final))
+                break
+            except FileExistsError:
+                i += 1
+                nome_final = f"{base_name}_{i}"
 
         self.output_base_dir = os.path.join(base_dir, nome_final)
-        os.makedirs(self.output_base_dir, exist_ok=True)
 
         self.parsed_diagram: PlantUMLDiagrama = parsed_diagram
         self.base_package: str = base_package
@@ -44,7 +48,7 @@ class MainCodeGenerator:
         self._all_defined_structure_names: Set[str] = self._collect_all_structure_names()
         self._structure_package_paths: Dict[str, str] = self._map_structure_package_paths()
 
-        self.type_mapper: TypeMapper = TypeMapper()
+        self.type_mapper: TypeMapper = DEFAULT_TYPE_MAPPER
         self.import_manager: ImportManager = ImportManager()
 
     def _collect_all_structure_names(self) -> Set[str]:
@@ -1,72 +1,93 @@
 """
 Mapeamento de tipos PlantUML para tipos Java.
 """
-from typing import Dict, Set
+from types import MappingProxyType
+from typing import FrozenSet, Mapping, Set
 from .utils import to_pascal_case
 
+# Mapeamento básico de tipos PlantUML para Java.
+# Construído uma única vez no import e exposto somente para leitura,
+# de modo que todas as instâncias de TypeMapper compartilham a mesma tabela.
+_TYPE_MAPPING: Mapping[str, str] = MappingProxyType({
+    # Tipos primitivos
+    "String": "String",
+    "string": "String", 
+    "str": "String",
+    "int": "int",
+    "Integer": "int",
+    "long": "long",
+    "Long": "long",
+    "float": "float",
+    "Float": "float", 
+    "double": "double",
+    "Double": "double",
+    "bool": "boolean",
+    "Boolean": "boolean",
+    "boolean": "boolean",
+    "char": "char",
+    "Char": "char",
+    "Character": "char",
+    "byte": "byte",
+    "Byte": "byte",
+    "short": "short",
+    "Short": "short",
+
+    # Tipos de data/hora
+    "Date": "java.util.Date",
+    "DateTime": "java.time.LocalDateTime", 
+    "date": "java.util.Date",
+    "datetime": "java.time.LocalDateTime",
+    "Time": "java.time.LocalTime",
+    "TimeSpan": "java.time.Duration",
+
+    # Tipos especiais
+    "void": "void",
+    "Object": "Object",
+    "object": "Object",
+    "Any": "Object",
+    "None": "void",
+    "null": "Object"
+})
+
+# Tipos que precisam de import statements
+_IMPORT_REQUIREMENTS: Mapping[str, FrozenSet[str]] = MappingProxyType({
+    "Date": frozenset({"java.util.Date"}),
+    "LocalDateTime": frozenset({"java.time.LocalDateTime"}),
+    "LocalTime": frozenset({"java.time.LocalTime"}),
+    "Duration": frozenset({"java.time.Duration"}),
+    "List": frozenset({"java.util.List"}),
+    "ArrayList": frozenset({"java.util.ArrayList"}),
+    "Set": frozenset({"java.util.Set"}),
+    "HashSet": frozenset({"java.util.HashSet"}),
+    "Map": frozenset({"java.util.Map"}),
+    "HashMap": frozenset({"java.util.HashMap"}),
+    "Queue": frozenset({"java.util.Queue"}),
+    "Deque": frozenset({"java.util.Deque"}),
+    "Stack": frozenset({"java.util.Stack"}),
+    "Collection": frozenset({"java.util.Collection"}),
+})
+
+_GENERIC_BASE_MAPPING: Mapping[str, str] = MappingProxyType({
+    "List": "List",
+    "ArrayList": "ArrayList",
+    "Array": "ArrayList",
+    "Set": "Set",
+    "HashSet": "HashSet",
+    "Map": "Map",
+    "HashMap": "HashMap", 
+    "Dictionary": "Map",
+    "Queue": "Queue",
+    "Deque": "Deque",
+    "Stack": "Stack",
+    "Collection": "Collection",
+})
+
 class TypeMapper:
     """Mapeia tipos PlantUML para tipos Java equivalentes."""
     
     def __init__(self):
-        # Mapeamento básico de tipos PlantUML para Java
-        self.type_mapping: Dict[str, str] = {
-            # Tipos primitivos
-            "String": "String",
-            "string": "String", 
-            "str": "String",
-            "int": "int",
-            "Integer": "int",
-            "long": "long",
-            "Long": "long",
-            "float": "float",
-            "Float": "float", 
-            "double": "double",
-            "Double": "double",
-            "bool": "boolean",
-            "Boolean": "boolean",
-            "boolean": "boolean",
-            "char": "char",
-            "Char": "char",
-            "Character": "char",
-            "byte": "byte",
-            "Byte": "byte",
-            "short": "short",
-            "Short": "short",
-            
-            # Tipos de data/hora
-            "Date": "java.util.Date",
-            "DateTime": "java.time.LocalDateTime", 
-            "date": "java.util.Date",
-            "datetime": "java.time.LocalDateTime",
-            "Time": "java.time.LocalTime",
-            "TimeSpan": "java.time.Duration",
-            
-            # Tipos especiais
-            "void": "void",
-            "Object": "Object",
-            "object": "Object",
-            "Any": "Object",
-            "None": "void",
-            "null": "Object"
-        }
-        
-        # Tipos que precisam de import statements
-        self.import_requirements: Dict[str, Set[str]] = {
-            "Date": {"java.util.Date"},
-            "LocalDateTime": {"java.time.LocalDateTime"},
-            "LocalTime": {"java.time.LocalTime"},
-            "Duration": {"java.time.Duration"},
-            "List": {"java.util.List"},
-            "ArrayList": {"java.util.ArrayList"},
-            "Set": {"java.util.Set"},
-            "HashSet": {"java.util.HashSet"},
-            "Map": {"java.util.Map"},
-            "HashMap": {"java.util.HashMap"},
-            "Queue": {"java.util.Queue"},
-            "Deque": {"java.util.Deque"},
-            "Stack": {"java.util.Stack"},
-            "Collection": {"java.util.Collection"},
-        }
+        self.type_mapping: Mapping[str, str] = _TYPE_MAPPING
+        self.import_requirements: Mapping[str, FrozenSet[str]] = _IMPORT_REQUIREMENTS
 
     def get_java_type_hint_and_imports(self, plantuml_type: str) -> str:
         """
@@ -78,24 +99,25 @@ class TypeMapper:
         Returns:
             String com o tipo Java correspondente
         """
-        if not plantuml_type or plantuml_type.strip() == "":
+        if not plantuml_type:
             return "Object"
         
         clean_type = plantuml_type.strip()
+        if not clean_type:
+            return "Object"
         
         # Se for tipo direto no mapeamento
-        if clean_type in self.type_mapping:
-            return self.type_mapping[clean_type]
+        mapped_type = self.type_mapping.get(clean_type)
+        if mapped_type is not None:
+            return mapped_type
         
-        # Genérico (List<T>, Map<K,V>, etc.)
-        if self._is_generic_type(clean_type):
+        # Genérico (List<T>, Map<K,V>, etc.) - verificação inline, sem chamada de método
+        if "<" in clean_type and ">" in clean_type:
             return self._map_generic_type(clean_type)
         
         # Arrays
         if clean_type.endswith("[]"):
-            element_type = clean_type[:-2].strip()
-            mapped_element = self.get_java_type_hint_and_imports(element_type)
-            return f"{mapped_element}[]"
+            return self.get_java_type_hint_and_imports(clean_type[:-2].rstrip()) + "[]"
         
         # Tipo customizado (classe do usuário)
         return to_pascal_case(clean_type)
@@ -123,21 +145,7 @@ class TypeMapper:
             return f"{java_base}<{mapped_param}>"
     
     def _map_generic_base_type(self, base_type: str) -> str:
-        generic_mapping = {
-            "List": "List",
-            "ArrayList": "ArrayList",
-            "Array": "ArrayList",
-            "Set": "Set",
-            "HashSet": "HashSet",
-            "Map": "Map",
-            "HashMap": "HashMap", 
-            "Dictionary": "Map",
-            "Queue": "Queue",
-            "Deque": "Deque",
-            "Stack": "Stack",
-            "Collection": "Collection",
-        }
-        return generic_mapping.get(base_type, base_type)
+        return _GENERIC_BASE_MAPPING.get(base_type, base_type)
     
     def get_required_imports(self, plantuml_type: str) -> Set[str]:
         """
@@ -178,4 +186,8 @@ class TypeMapper:
             element_type = clean_type[:-2].strip()
             imports.update(self.get_required_imports(element_type))
         
-        return imports
\ No newline at end of file
+        return imports
+
+
+# Instância compartilhada usada pelos geradores quando nenhum mapper é fornecido.
+DEFAULT_TYPE_MAPPER = TypeMapper()
@@ -143,21 +143,19 @@ def format_method_signature(
 ) -> str:
     """
     Formata uma assinatura de método Java.
+
+    A visibilidade pode ser vazia (package-private); os modificadores
+    recebidos devem ser todos não vazios.
     """
-    all_modifiers = []
-    if visibility:
-        all_modifiers.append(visibility)
-    if modifiers:
-        all_modifiers.extend(modifiers)
-    modifiers_str = " ".join([m for m in all_modifiers if m])
-    if modifiers_str:
-        modifiers_str += " "
+    if not modifiers:
+        head = f"{visibility} " if visibility else ""
+    else:
+        head = (" ".join([visibility, *modifiers]) if visibility else " ".join(modifiers)) + " "
     params_str = ", ".join(parameters) if parameters else ""
     # Para interface métodos, não há corpo nem modificador de visibilidade
     if is_interface:
-        return f"{modifiers_str}{return_type} {method_name}({params_str});"
-    else:
-        return f"{modifiers_str}{return_type} {method_name}({params_str})"
+        return f"{head}{return_type} {method_name}({params_str});"
+    return f"{head}{return_type} {method_name}({params_str})"
 
 def format_property_declaration(
     visibility: str,
@@ -169,16 +167,14 @@ def format_property_declaration(
 ) -> str:
     """
     Formata uma declaração de propriedade Java (campo).
+
+    A visibilidade pode ser vazia (package-private); os modificadores
+    recebidos devem ser todos não vazios.
     """
-    all_modifiers = []
-    if visibility:
-        all_modifiers.append(visibility)
-    if modifiers:
-        all_modifiers.extend(modifiers)
-    modifiers_str = " ".join([m for m in all_modifiers if m])
-    if modifiers_str:
-        modifiers_str += " "
-    if default_value is not None:
-        return f"{modifiers_str}{property_type} {property_name} = {default_value};"
+    if not modifiers:
+        head = f"{visibility} " if visibility else ""
     else:
-        return f"{modifiers_str}{property_type} {property_name};"
\ No newline at end of file
+        head = (" ".join([visibility, *modifiers]) if visibility else " ".join(modifiers)) + " "
+    if default_value is not None:
+        return f"{head}{property_type} {property_name} = {default_value};"
+    return f"{head}{property_type} {property_name};"
\ No newline at end of file
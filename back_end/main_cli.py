@@ -2,143 +2,272 @@
 CLI para rodar o backend do conversor PlantUML para Python, C# e java.
 
 Uso:
-    python back_end/main_cli.py [--input caminho/arquivo.puml] [--output pasta_saida] [--language python|java|csharp]
+    python -m back_end.main_cli [--input caminho/arquivo.puml] [--output pasta_saida] [--language python|java|csharp]
     
     Se não for especificado um arquivo de entrada, será usado o exemplo_diagrama.plantuml
-    da pasta data/diagramas.
+    da pasta data/diagramas. Vários arquivos podem ser passados em --input; nesse caso
+    eles são convertidos em paralelo e cada um gera a pasta com o nome do próprio arquivo.
     
     Se não for especificada a linguagem, será gerado código Python por padrão.
+
+    Com --serve, o processo fica ativo lendo pedidos JSON da entrada padrão, um por
+    linha, no formato [arquivo, linguagem, pasta_saida], e responde cada um com uma
+    linha JSON {"arquivos": [...], "erros": [...]}: os arquivos gerados e as mensagens
+    de erro (erros léxicos e, se a conversão falhar, o motivo da falha).
 """
 
-import argparse
+import json
 import os
+import stat
 import sys
-import traceback
-
-# Verificar se o script está sendo executado do diretório correto
-current_dir = os.getcwd()
-# Verifica se estamos no diretório PlantUMLToPythonConverter
-if not (os.path.basename(current_dir) == 'PlantUMLToPythonConverter' or 
-        current_dir.endswith('PlantUMLToPythonConverter')):
-    print("\nAVISO: Você parece estar no diretório incorreto.")
-    print(f"Diretório atual: {current_dir}")
-    print("Execute o script como:")
-    print("  python back_end/main_cli.py")
-    print("Ou navegue para o diretório correto do projeto PlantUMLToPythonConverter")
-    sys.exit(1)
-
-# Verificar se o ply está instalado
-try:
-    import ply
-except ImportError:
-    print("Erro: biblioteca 'ply' não instalada. Execute 'pip install ply'")
-    sys.exit(1)
+from pathlib import Path
 
-# Adiciona o diretório raiz do projeto ao path do Python
+# Diretório raiz do projeto, usado para localizar o diagrama de exemplo
 script_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.abspath(os.path.join(script_dir, '..'))
-sys.path.insert(0, project_root)
+
+# Locais onde o diagrama de exemplo é procurado quando --input não é informado
+_EXAMPLE_PATHS = (
+    os.path.join(project_root, 'data', 'diagramas', 'exemplo_diagrama.plantuml'),
+    os.path.join(project_root, 'data', 'diagramas', 'exemplo_diagrama.puml'),
+    os.path.join(project_root, 'diagramas', 'exemplo_diagrama.plantuml'),
+    os.path.join(project_root, 'diagramas', 'exemplo_diagrama.puml'),
+)
 
 # Importa os módulos necessários
 try:
-    from back_end.plantuml_parser.parser import PlantUMLParser
-    from back_end.python_generator.main_generator import MainCodeGenerator as PythonGenerator
-    from back_end.csharp_generator.main_generator import MainCodeGenerator as CSharpGenerator
-    from back_end.java_generator.main_generator import MainCodeGenerator as JavaGenerator
+    from .plantuml_parser.lexer import format_errors
+    from .plantuml_parser.parser import parse_cached
+    from .python_generator.main_generator import MainCodeGenerator as PythonGenerator
+    from .csharp_generator.main_generator import MainCodeGenerator as CSharpGenerator
+    from .java_generator.main_generator import MainCodeGenerator as JavaGenerator
 except ImportError as e:
     print(f"Erro ao importar módulos: {e}")
-    print("Execute: python back_end/main_cli.py")
+    print("Execute: python -m back_end.main_cli")
     sys.exit(1)
 
+def _build_generator(diagrama, language, output_dir, diagram_name=None, namespace='GeneratedCode'):
+    """Cria o gerador de código adequado para a linguagem de destino."""
+    if language == 'python':
+        return PythonGenerator(diagrama, output_dir, diagram_name=diagram_name)
+    elif language == 'csharp':
+        return CSharpGenerator(
+            parsed_diagram=diagrama,
+            output_base_dir=output_dir,
+            diagram_name=diagram_name,
+            base_namespace=namespace
+        )
+    elif language == 'java':
+        return JavaGenerator(
+            parsed_diagram=diagrama,
+            output_base_dir=output_dir,
+            diagram_name=diagram_name,
+            base_package=namespace
+        )
+    raise ValueError(f"Linguagem não suportada: {language}")
+
+def _read_plantuml(input_path):
+    """
+    Lê o arquivo PlantUML inteiro em uma única leitura binária e decodifica em UTF-8,
+    sem a camada de texto do open().
+    """
+    plantuml_code = Path(input_path).read_bytes().decode('utf-8')
+    # Mantém a normalização de quebras de linha feita pela leitura em modo texto
+    if '\r' in plantuml_code:
+        plantuml_code = plantuml_code.replace('\r\n', '\n').replace('\r', '\n')
+    return plantuml_code
+
+def _is_missing_input(exc, input_path):
+    """
+    Indica se o erro é a falta do próprio arquivo de entrada, e não de outro
+    caminho usado durante a conversão (ex.: pasta de saída inválida).
+    """
+    return isinstance(exc, FileNotFoundError) and exc.filename == str(Path(input_path))
+
+def convert(input_path, language='python', output_dir='output_generated_code',
+            diagram_name=None, namespace='GeneratedCode', errors=None):
+    """
+    Converte um arquivo PlantUML sem passar pela linha de comando.
+
+    Permite que outros módulos (ex: app.py) façam a conversão no mesmo processo,
+    reaproveitando os diagramas já parseados (parse_cached). Com uma lista em
+    `errors`, os erros léxicos são acrescentados a ela em vez de escritos no stdout.
+
+    Returns:
+        Lista com os arquivos gerados.
+    """
+    return _convert_one(input_path, language, output_dir, diagram_name, namespace, errors)[1]
+
+def _convert_one(input_path, language, output_dir, diagram_name=None, namespace='GeneratedCode',
+                 errors=None):
+    """Converte um arquivo e retorna a pasta gerada e a lista de arquivos gerados."""
+    plantuml_code = _read_plantuml(input_path)
+    diagrama = parse_cached(plantuml_code, errors)
+    generator = _build_generator(diagrama, language, output_dir, diagram_name, namespace)
+    arquivos_gerados = generator.generate_files()
+    return generator.output_base_dir, arquivos_gerados
+
+def _print_result(language, output_base_dir, arquivos_gerados):
+    """Imprime a pasta gerada (capturada pelo app.py) e a lista de arquivos."""
+    print(f"[PASTA_GERADA]: {os.path.relpath(output_base_dir)}")
+
+    if arquivos_gerados:
+        print(f"Arquivos {language.upper()} gerados em '{os.path.abspath(output_base_dir)}':")
+        # Os caminhos gerados são montados a partir de output_base_dir (ou já são
+        # relativos a ele), então basta remover o prefixo em vez de usar relpath
+        base = os.path.join(output_base_dir, '')
+        for arq in sorted(arquivos_gerados):
+            print(f"  - {arq.removeprefix(base)}")
+    else:
+        print("Nenhum arquivo foi gerado.")
+
+def _convert_many(input_paths, args):
+    """
+    Converte vários arquivos em paralelo, um processo por núcleo.
+
+    O parsing é CPU-bound em Python puro, então threads não ajudariam por causa do GIL.
+    Os processos compartilham o cache em disco do parse_cached: um diagrama já
+    parseado por qualquer um deles não é parseado de novo.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    falhas = 0
+    with ProcessPoolExecutor() as executor:
+        # O nome do arquivo vira o nome da pasta de saída; entradas com o mesmo nome
+        # (ex.: d1/x.plantuml e d2/x.plantuml) não colidem, pois cada gerador reserva
+        # a sua pasta com os.mkdir e passa ao próximo sufixo se outro processo chegou antes
+        futures = [
+            executor.submit(_convert_one, path, args.language, args.output,
+                            Path(path).stem, args.namespace)
+            for path in input_paths
+        ]
+        for path, future in zip(input_paths, futures):
+            print(f"Convertendo {path} para {args.language.upper()}...")
+            try:
+                _print_result(args.language, *future.result())
+            except SyntaxError as e:
+                print(f"Erro de sintaxe em {path}: {e}")
+                falhas += 1
+            except Exception as e:
+                if _is_missing_input(e, path):
+                    print(f"Erro: Arquivo não encontrado: {path}")
+                else:
+                    print(f"Erro em {path}: {e}")
+                falhas += 1
+    return 1 if falhas else 0
+
+def _serve(stdin=None, stdout=None):
+    """
+    Atende pedidos de conversão lidos da entrada padrão até o fim do fluxo.
+
+    Mantém um único processo vivo, evitando o custo de iniciar o Python e
+    construir o lexer a cada conversão, e o cache em memória do parse_cached.
+    O stdout é só das respostas: os erros léxicos vão na própria resposta, que
+    tem o mesmo formato com sucesso ou falha.
+    """
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    for line in stdin:
+        if not line.strip():
+            continue
+        erros_lexicos = []
+        try:
+            path, lang, out = json.loads(line)
+            resposta = {"arquivos": convert(path, lang, out, errors=erros_lexicos), "erros": []}
+        except Exception as e:
+            resposta = {"arquivos": [], "erros": [str(e)]}
+        # Os erros léxicos vêm antes do motivo da falha, que muitas vezes é consequência deles
+        resposta["erros"][:0] = format_errors(erros_lexicos).splitlines()
+        stdout.write(json.dumps(resposta) + "\n")
+        stdout.flush()
+    return 0
+
+def _is_regular_file(path):
+    """Verifica existência e tipo do arquivo com uma única chamada a os.stat."""
+    try:
+        return stat.S_ISREG(os.stat(path).st_mode)
+    except OSError:
+        return False
+
+def _check_working_directory():
+    """Encerra o CLI se ele não estiver sendo executado a partir da raiz do projeto."""
+    current_dir = os.getcwd()
+    # Verifica se estamos no diretório PlantUMLToPythonConverter
+    if not (os.path.basename(current_dir) == 'PlantUMLToPythonConverter' or 
+            current_dir.endswith('PlantUMLToPythonConverter')):
+        print("\nAVISO: Você parece estar no diretório incorreto.")
+        print(f"Diretório atual: {current_dir}")
+        print("Execute o script como:")
+        print("  python -m back_end.main_cli")
+        print("Ou navegue para o diretório correto do projeto PlantUMLToPythonConverter")
+        sys.exit(1)
+
 def main():
+    # argparse só é importado aqui: quem usa apenas convert() não paga por ele
+    import argparse
+
     # Parser de argumentos com mensagens de ajuda
     parser = argparse.ArgumentParser(
         description="Conversor PlantUML para Python, Java e C#",
         epilog="Se não for especificado um arquivo de entrada, será usado o exemplo_diagrama.plantuml"
     )
-    parser.add_argument('--input', '-i', help='Arquivo PlantUML de entrada')
+    parser.add_argument('--input', '-i', nargs='+', help='Arquivo(s) PlantUML de entrada')
     parser.add_argument('--output', '-o', default='output_generated_code', help='Diretório de saída')
-    parser.add_argument('--diagram-name', default=None, help='Nome do diagrama para a pasta de saída')
+    parser.add_argument('--diagram-name', default=None,
+                       help='Nome do diagrama para a pasta de saída (apenas com um único arquivo de entrada)')
     parser.add_argument('--language', '-l', choices=['python', 'csharp', 'java'], default='python', 
                        help='Linguagem de destino (python, csharp ou java). Padrão: python')
     parser.add_argument('--namespace', '-n', default='GeneratedCode', 
                        help='Namespace base para C# (ignorado para Python). Padrão: GeneratedCode')
+    parser.add_argument('--serve', action='store_true',
+                       help='Lê pedidos JSON [arquivo, linguagem, saida] da entrada padrão, um por linha')
     args = parser.parse_args()
+
+    if args.serve:
+        return _serve()
     
     # Se não for especificado um arquivo de entrada, usa o exemplo
     if not args.input:
-        # Tenta encontrar o arquivo de exemplo em diferentes locais
-        possible_paths = [
-            os.path.join(project_root, 'data', 'diagramas', 'exemplo_diagrama.plantuml'),
-            os.path.join(project_root, 'data', 'diagramas', 'exemplo_diagrama.puml'),
-            os.path.join(project_root, 'diagramas', 'exemplo_diagrama.plantuml'),
-            os.path.join(project_root, 'diagramas', 'exemplo_diagrama.puml'),
-        ]
-        
-        for path in possible_paths:
-            if os.path.isfile(path):
-                args.input = path
-                print(f"Usando exemplo: {path}")
-                break
-        
-        if not args.input:
+        # Usa o primeiro arquivo de exemplo encontrado
+        exemplo = next((p for p in _EXAMPLE_PATHS if _is_regular_file(p)), None)
+        if not exemplo:
             print("Erro: Especifique um arquivo de entrada com --input")
             sys.exit(1)
+        print(f"Usando exemplo: {exemplo}")
+        args.input = [exemplo]
 
-    # Verificação do arquivo de entrada
-    if not os.path.isfile(args.input):
-        print(f"Erro: Arquivo não encontrado: {args.input}")
-        sys.exit(1)
+    # Não há verificação prévia com stat: a própria leitura do arquivo
+    # (um único open) acusa quando ele não existe
+    if len(args.input) > 1:
+        return _convert_many(args.input, args)
 
-    # Leitura do arquivo
+    input_path = args.input[0]
     try:
-        with open(args.input, 'r', encoding='utf-8') as f:
-            plantuml_code = f.read()
-        print(f"Convertendo {args.input} para {args.language.upper()} para {args.language.upper()}...")
-        
-        # Processamento do diagrama
-        parser_backend = PlantUMLParser()
-        diagrama = parser_backend.parse(plantuml_code)
-        # Escolhe o gerador baseado na linguagem
-        if args.language == 'python':
-            generator = PythonGenerator(diagrama, args.output, diagram_name=args.diagram_name)
-        elif args.language == 'csharp':
-            generator = CSharpGenerator(
-                parsed_diagram=diagrama, 
-                output_base_dir=args.output, 
-                diagram_name=args.diagram_name,
-                base_namespace=args.namespace
-            )
-        elif args.language == 'java':
-            generator = JavaGenerator(
-                parsed_diagram=diagrama, 
-                output_base_dir=args.output, 
-                diagram_name=args.diagram_name,
-                base_package=args.namespace
-            )
-        
-        arquivos_gerados = generator.generate_files()
-        
-        # NOVO: imprime o caminho da pasta gerada para o app.py capturar
-        print(f"[PASTA_GERADA]: {os.path.relpath(generator.output_base_dir)}")
-        
-        if arquivos_gerados:
-            print(f"Arquivos {args.language.upper()} gerados em '{os.path.abspath(generator.output_base_dir)}':")
-            for arq in sorted(arquivos_gerados):
-                rel_path = os.path.relpath(arq, generator.output_base_dir)
-                print(f"  - {rel_path}")
-        else:
-            print("Nenhum arquivo foi gerado.")
+        print(f"Convertendo {input_path} para {args.language.upper()} para {args.language.upper()}...")
+        output_base_dir, arquivos_gerados = _convert_one(
+            input_path, args.language, args.output, args.diagram_name, args.namespace
+        )
+        # Imprime o caminho da pasta gerada para o app.py capturar
+        _print_result(args.language, output_base_dir, arquivos_gerados)
 
     except SyntaxError as e:
         print(f"Erro de sintaxe: {e}")
         sys.exit(1)
     except Exception as e:
+        # Só a falta do arquivo de entrada vira a mensagem curta; outros arquivos
+        # ausentes (ex.: pasta de saída inválida) seguem com o traceback
+        if _is_missing_input(e, input_path):
+            print(f"Erro: Arquivo não encontrado: {input_path}")
+            sys.exit(1)
         print(f"Erro: {e}")
+        import traceback
         traceback.print_exc()
         sys.exit(1)
 
     return 0
 
 if __name__ == "__main__":
+    # A verificação de diretório só faz sentido na linha de comando;
+    # quem importa o módulo (ex: para usar convert()) não passa por ela.
+    _check_working_directory()
     sys.exit(main())
\ No newline at end of file
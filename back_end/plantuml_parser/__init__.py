@@ -4,10 +4,12 @@ Pacote principal para parsing de diagramas PlantUML.
 Inclui o parser e as estruturas de dados necessárias para representar o diagrama.
 """
 
-from .parser import PlantUMLParser
+from .parser import PlantUMLParser, parse_cached, clear_parse_cache
 from . import data_structures
 
 __all__ = [
     "PlantUMLParser",
+    "parse_cached",
+    "clear_parse_cache",
     "data_structures",
 ]
\ No newline at end of file
@@ -0,0 +1,4 @@
+# Coleção vazia compartilhada pelas estruturas de dados: as listas (atributos,
+# métodos, parâmetros, elementos de pacote...) só são alocadas no primeiro adicionar_*.
+# Definida num único módulo para que os testes "is _EMPTY" comparem sempre o mesmo objeto.
+_EMPTY: tuple = ()
\ No newline at end of file
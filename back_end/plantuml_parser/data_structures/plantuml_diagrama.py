@@ -1,3 +1,4 @@
+from dataclasses import dataclass, field
 from typing import List
 from .plantuml_pacote import PlantUMLPacote
 from .plantuml_relacionamento import PlantUMLRelacionamento
@@ -5,13 +6,12 @@ from .plantuml_classe import PlantUMLClasse
 from .plantuml_enum import PlantUMLEnum
 from .plantuml_interface import PlantUMLInterface
 
+@dataclass(slots=True, eq=False)
 class PlantUMLDiagrama:
     """Representa o diagrama PlantUML completo como uma coleção de elementos e relacionamentos."""
 
-    def __init__(self):
-        """Inicializa uma nova instância de PlantUMLDiagrama, pronta para ser populada."""
-        self.elementos: List[PlantUMLClasse | PlantUMLEnum | PlantUMLInterface | PlantUMLPacote] = []
-        self.relacionamentos: List[PlantUMLRelacionamento] = []
+    elementos: List[PlantUMLClasse | PlantUMLEnum | PlantUMLInterface | PlantUMLPacote] = field(default_factory=list, init=False)
+    relacionamentos: List[PlantUMLRelacionamento] = field(default_factory=list, init=False)
 
     def adicionar_elemento(self, elemento: PlantUMLClasse | PlantUMLEnum | PlantUMLInterface | PlantUMLPacote):
         """
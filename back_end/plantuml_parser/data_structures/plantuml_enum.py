@@ -1,10 +1,14 @@
-from typing import List, Optional
-from .plantuml_estrutura_base import PlantUMLEstruturaBase
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+from .plantuml_estrutura_base import PlantUMLEstruturaBase, _EMPTY
 from .plantuml_atributo import PlantUMLAtributo
 
+@dataclass(slots=True, eq=False, init=False)
 class PlantUMLEnum(PlantUMLEstruturaBase):
     """Representa uma enumeração (enum) definida em um diagrama PlantUML."""
 
+    valores_enum: Sequence[str]
+
     def __init__(self,
                  nome: str,
                  valores_enum: Optional[List[str]] = None):
@@ -14,18 +18,22 @@ class PlantUMLEnum(PlantUMLEstruturaBase):
         Args:
             nome: O nome da enumeração.
             valores_enum: Uma lista de strings representando os valores constantes do enum. 
-                    Opcional, o padrão é uma lista vazia.
+                    Opcional, o padrão é uma coleção vazia.
         """
         
-        atributos_enum = []
-        if valores_enum:
-            for valor in valores_enum:
-                atributos_enum.append(PlantUMLAtributo(nome=valor))
+        atributos_enum = [PlantUMLAtributo(nome=valor) for valor in valores_enum] if valores_enum else None
         
-        super().__init__(nome, atributos=atributos_enum, metodos=None)
-        self.valores_enum : List[str] = valores_enum if valores_enum is not None else []
+        PlantUMLEstruturaBase.__init__(self, nome, atributos=atributos_enum, metodos=None)
+        self.valores_enum = valores_enum or _EMPTY
+
+    def adicionar_valor(self, valor: str):
+        """Adiciona um valor ao enum, alocando a lista apenas no primeiro uso."""
+        if self.valores_enum is _EMPTY:
+            self.valores_enum = [valor]
+        else:
+            self.valores_enum.append(valor)
 
     def __repr__(self) -> str:
         """Retorna uma representação em string oficial do objeto PlantUMLEnum."""
         
-        return f"PlantUMLEnum(nome='{self.nome}', valores={self.valores_enum})"
\ No newline at end of file
+        return f"PlantUMLEnum(nome='{self.nome}', valores={list(self.valores_enum)})"
\ No newline at end of file
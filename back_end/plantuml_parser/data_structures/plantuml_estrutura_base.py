@@ -1,29 +1,46 @@
-from typing import List, Optional
+from dataclasses import dataclass
+from typing import Sequence
 from .plantuml_atributo import PlantUMLAtributo
 from .plantuml_metodo import PlantUMLMetodo
+from ._colecao_vazia import _EMPTY
 
+@dataclass(slots=True, eq=False)
 class PlantUMLEstruturaBase:
     """
     Base para estruturas como classes, enums e interfaces do PlantUML.
+
+    Args:
+        nome: O nome da estrutura PlantUML.
+        atributos: Uma lista opcional de objetos PlantUMLAtributo associados a esta estrutura.
+                O padrão é uma coleção vazia.
+        metodos: Uma lista opcional de objetos PlantUMLMetodo associados a esta estrutura.
+                O padrão é uma coleção vazia.
     """
 
-    def __init__(self,
-                 nome: str,
-                 atributos: Optional[List[PlantUMLAtributo]] = None,
-                 metodos: Optional[List[PlantUMLMetodo]] = None):
-        """
-        Inicializa uma nova instância de PlantUMLEstruturaBase.
+    nome: str
+    atributos: Sequence[PlantUMLAtributo] = _EMPTY
+    metodos: Sequence[PlantUMLMetodo] = _EMPTY
+
+    def __post_init__(self):
+        # Aceita None ou lista vazia como "sem membros"
+        if not self.atributos:
+            self.atributos = _EMPTY
+        if not self.metodos:
+            self.metodos = _EMPTY
+
+    def adicionar_atributo(self, atributo: PlantUMLAtributo):
+        """Adiciona um atributo, alocando a lista apenas no primeiro uso."""
+        if self.atributos is _EMPTY:
+            self.atributos = [atributo]
+        else:
+            self.atributos.append(atributo)
 
-        Args:
-            nome: O nome da estrutura PlantUML.
-            atributos: Uma lista opcional de objetos PlantUMLAtributo associados a esta estrutura.
-                    O padrão é uma lista vazia.
-            metodos: Uma lista opcional de objetos PlantUMLMetodo associados a esta estrutura.
-                    O padrão é uma lista vazia.
-        """
-        self.nome: str = nome
-        self.atributos: List[PlantUMLAtributo] = atributos if atributos is not None else []
-        self.metodos: List[PlantUMLMetodo] = metodos if metodos is not None else []
+    def adicionar_metodo(self, metodo: PlantUMLMetodo):
+        """Adiciona um método, alocando a lista apenas no primeiro uso."""
+        if self.metodos is _EMPTY:
+            self.metodos = [metodo]
+        else:
+            self.metodos.append(metodo)
 
     def __repr__(self) -> str:
         """Retorna uma representação em string do objeto PlantUMLEstruturaBase."""
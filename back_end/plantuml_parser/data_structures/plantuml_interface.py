@@ -1,34 +1,40 @@
-from typing import List, Optional
-from .plantuml_estrutura_base import PlantUMLEstruturaBase
-from .plantuml_metodo import PlantUMLMetodo
-from .plantuml_atributo import PlantUMLAtributo
+from dataclasses import dataclass
+from typing import Sequence
+from .plantuml_estrutura_base import PlantUMLEstruturaBase, _EMPTY
 
+@dataclass(slots=True, eq=False)
 class PlantUMLInterface(PlantUMLEstruturaBase):
-    """Representa uma interface definida em um diagrama PlantUML."""
+    """
+    Representa uma interface definida em um diagrama PlantUML.
 
-    def __init__(self,
-                 nome: str,
-                 atributos: Optional[List[PlantUMLAtributo]] = None,
-                 metodos: Optional[List[PlantUMLMetodo]] = None,
-                 interfaces_pai: Optional[List[str]] = None):
-        """
-        Inicializa uma nova instância de PlantUMLInterface.
+    Args:
+        nome: O nome da interface.
+        atributos: Uma lista opcional de objetos PlantUMLAtributo (geralmente constantes) para esta interface.
+                O padrão é uma coleção vazia.
+        metodos: Uma lista opcional de objetos PlantUMLMetodo (geralmente abstratos) para esta interface.
+                O padrão é uma coleção vazia.
+        interfaces_pai: Uma lista opcional de nomes de interfaces das quais esta interface herda.
+                O padrão é uma coleção vazia.
+    """
 
-        Args:
-            nome: O nome da interface.
-            atributos: Uma lista opcional de objetos PlantUMLAtributo (geralmente constantes) para esta interface.
-                    O padrão é uma lista vazia.
-            metodos: Uma lista opcional de objetos PlantUMLMetodo (geralmente abstratos) para esta interface.
-                    O padrão é uma lista vazia.
-            interfaces_pai: Uma lista opcional de nomes de interfaces das quais esta interface herda.
-                    O padrão é uma lista vazia.
-        """
-        
-        super().__init__(nome, atributos, metodos)
-        self.interfaces_pai: List[str] = interfaces_pai if interfaces_pai is not None else []
+    interfaces_pai: Sequence[str] = _EMPTY
+
+    def __post_init__(self):
+        # super() sem argumentos não funciona em dataclasses com slots
+        PlantUMLEstruturaBase.__post_init__(self)
+        if not self.interfaces_pai:
+            self.interfaces_pai = _EMPTY
+
+    def adicionar_interface_pai(self, interface: str):
+        """Registra uma interface herdada, alocando a lista apenas no primeiro uso."""
+        if self.interfaces_pai is _EMPTY:
+            self.interfaces_pai = [interface]
+        else:
+            self.interfaces_pai.append(interface)
 
     def __repr__(self) -> str:
         """Retorna uma representação em string do objeto PlantUMLInterface."""
         
-        base_repr = super().__repr__()
-        return f"{base_repr[:-1]}, pais='{self.interfaces_pai}')"
\ No newline at end of file
+        return (f"{self.__class__.__name__}(nome='{self.nome}', "
+                f"atributos={len(self.atributos)}, metodos={len(self.metodos)}, "
+                f"pais='{list(self.interfaces_pai)}')")
\ No newline at end of file
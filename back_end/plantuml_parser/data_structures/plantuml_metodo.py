@@ -1,22 +1,29 @@
-from typing import List, Optional
+import sys
+from dataclasses import dataclass
+from typing import Optional, Sequence
 from .plantuml_parametro import PlantUMLParametro
+from ._colecao_vazia import _EMPTY
 
+@dataclass(slots=True, eq=False)
 class PlantUMLMetodo:
     """Representa um método definido em uma classe ou interface PlantUML."""
 
-    def __init__(self,
-                 nome: str,
-                 parametros: Optional[List[PlantUMLParametro]] = None,
-                 tipo_retorno: Optional[str] = None,
-                 visibilidade: Optional[str] = None,
-                 is_static: bool = False,
-                 is_abstract: bool = False):
-        self.nome: str = nome
-        self.parametros: List[PlantUMLParametro] = parametros if parametros is not None else []
-        self.tipo_retorno: Optional[str] = tipo_retorno
-        self.visibilidade: Optional[str] = visibilidade
-        self.is_static: bool = is_static
-        self.is_abstract: bool = is_abstract
+    nome: str
+    parametros: Sequence[PlantUMLParametro] = _EMPTY
+    tipo_retorno: Optional[str] = None
+    visibilidade: Optional[str] = None
+    is_static: bool = False
+    is_abstract: bool = False
+
+    def __post_init__(self):
+        # Aceita None ou lista vazia como "sem parâmetros"
+        if not self.parametros:
+            self.parametros = _EMPTY
+        # Visibilidades e tipos de retorno se repetem muito entre os métodos
+        if self.tipo_retorno:
+            self.tipo_retorno = sys.intern(self.tipo_retorno)
+        if self.visibilidade:
+            self.visibilidade = sys.intern(self.visibilidade)
 
     def __repr__(self) -> str:
         """Retorna uma representação em string do objeto PlantUMLMetodo."""
@@ -1,4 +1,6 @@
-from typing import List, Union, TYPE_CHECKING
+from dataclasses import dataclass, field
+from typing import Sequence, Union, TYPE_CHECKING
+from ._colecao_vazia import _EMPTY
 
 if TYPE_CHECKING:
     from .plantuml_classe import PlantUMLClasse
@@ -12,19 +14,17 @@ TipoElementoPacote = Union[
     "PlantUMLPacote"
 ]
 
+@dataclass(slots=True, eq=False)
 class PlantUMLPacote:
-    """Representa um pacote (package) definido em um diagrama PlantUML, usado para agrupar outros elementos do diagrama."""
+    """
+    Representa um pacote (package) definido em um diagrama PlantUML, usado para agrupar outros elementos do diagrama.
 
-    def __init__(self, nome: str):
-        """
-        Inicializa uma nova instância de PlantUMLPacote.
+    Args:
+        nome: O nome do pacote.
+    """
 
-        Args:
-            nome: O nome do pacote.
-        """
-        
-        self.nome: str = nome
-        self.elementos: List[TipoElementoPacote] = []
+    nome: str
+    elementos: Sequence[TipoElementoPacote] = field(default=_EMPTY, init=False)
 
     def adicionar_elemento(self, elemento: TipoElementoPacote):
         """
@@ -35,7 +35,10 @@ class PlantUMLPacote:
             elemento: O objeto do elemento a ser adicionado.
         """
         
-        self.elementos.append(elemento)
+        if self.elementos is _EMPTY:
+            self.elementos = [elemento]
+        else:
+            self.elementos.append(elemento)
         
     def __repr__(self) -> str:
         """Retorna uma representação em string oficial do objeto PlantUMLPacote."""
@@ -1,13 +1,17 @@
+import sys
+from dataclasses import dataclass
 from typing import Optional
 
+@dataclass(slots=True, eq=False)
 class PlantUMLParametro:
     """Representa um parâmetro de um método em um diagrama PlantUML."""
 
-    def __init__(self,
-                 nome: str,
-                 tipo: Optional[str] = None):
-        self.nome: str = nome
-        self.tipo: Optional[str] = tipo
+    nome: str
+    tipo: Optional[str] = None
+
+    def __post_init__(self):
+        if self.tipo:
+            self.tipo = sys.intern(self.tipo)
 
     def __repr__(self) -> str:
         """Retorna uma representação em string do objeto."""
@@ -1,7 +1,11 @@
 """
 Módulo Lexer para o PlantUML Parser.
 """
-import ply.lex as lex
+import re
+import sys
+from collections import namedtuple
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional, Tuple
 
 tokens = (
     'AT_STARTUML', 'AT_ENDUML',
@@ -16,6 +20,7 @@ tokens = (
     'COLON', 'COMMA', 'EQUALS',
     'LINE_COMMENT',
     'SKINPARAM_DIRECTIVE', 
+    'BANG_DIRECTIVE',
     'STATIC_MODIFIER', 
     'ABSTRACT_MODIFIER',
     'ARROW_INHERITANCE_LEFT',
@@ -39,183 +44,260 @@ tokens = (
     'VISIBILITY',
 )
 
-t_ignore = ' \t'
-
-# --- FUNÇÕES DE TOKENS ---
+# Caracteres ignorados entre tokens. As quebras de linha não viram tokens,
+# apenas avançam o número da linha.
+IGNORE = ' \t\n'
+
+# Palavras-chave: são casadas pela regra de ID e reclassificadas por esta tabela,
+# então só contam como palavra-chave quando formam o identificador inteiro
+# ('endereco' é um ID, não END seguido de 'ereco').
+KEYWORDS = {
+    'package': 'PACKAGE',
+    'abstract': 'ABSTRACT',
+    'note': 'NOTE',
+    'end': 'END',
+    'class': 'CLASS',
+    'interface': 'INTERFACE',
+    'enum': 'ENUM',
+    'extends': 'EXTENDS',
+    'implements': 'IMPLEMENTS',
+}
 
-def t_AT_STARTUML(t):
-    r'@startuml'
-    return t
+# Setas: todas entram numa única alternativa ARROW da regex, na ordem abaixo
+# (a primeira que casar vence, por isso '--|>' vem antes de '--'), e o tipo do
+# token sai de ARROW_MAP pelo texto da seta.
+ARROWS = (
+    ('<|--', 'ARROW_INHERITANCE_LEFT'),
+    ('--|>', 'ARROW_INHERITANCE_RIGHT'),
+    ('<|..', 'ARROW_IMPLEMENTATION_LEFT_STRONG'),
+    ('..|>', 'ARROW_IMPLEMENTATION_RIGHT_STRONG'),
+    ('*--', 'ARROW_COMPOSITION_LEFT'),
+    ('--*', 'ARROW_COMPOSITION_RIGHT'),
+    ('o--', 'ARROW_AGGREGATION_LEFT'),
+    ('--o', 'ARROW_AGGREGATION_RIGHT'),
+    ('-->', 'ARROW_DIRECTED_ASSOCIATION_RIGHT'),
+    ('<--', 'ARROW_DIRECTED_ASSOCIATION_LEFT'),
+    ('..>', 'ARROW_DIRECTED_DEPENDENCY_RIGHT'),
+    ('<..', 'ARROW_DIRECTED_DEPENDENCY_LEFT'),
+    ('||--o{', 'ARROW_ONE_TO_MANY_LEFT'),
+    ('}o--||', 'ARROW_ONE_TO_MANY_RIGHT'),
+    ('{o--||', 'ARROW_MANY_TO_ONE_LEFT'),
+    # Mesmo texto de ARROW_ONE_TO_MANY_LEFT, que tem precedência
+    ('||--o{', 'ARROW_MANY_TO_ONE_RIGHT'),
+    ('--', 'ARROW_ASSOCIATION_LINE'),
+    ('..', 'ARROW_DEPENDENCY_LINE'),
+)
+# Percorrido de trás para frente para que, em textos repetidos, a primeira entrada prevaleça
+ARROW_MAP = {seta: tipo for seta, tipo in reversed(ARROWS)}
+
+# Valor dos modificadores, já sem as chaves. Assim como as setas (internadas
+# no scanner), todos os tokens iguais compartilham a mesma string.
+MODIFIERS = {'{static}': 'static', '{classifier}': 'classifier', '{abstract}': 'abstract'}
+
+# --- REGRAS DE TOKENS ---
+# As alternativas são tentadas da esquerda para a direita e a primeira que
+# casar vence, então as regras mais frequentes vêm primeiro. Em diagramas
+# típicos a ordem de frequência é aproximadamente: ID (nomes, tipos e
+# palavras-chave), pontuação dos membros ('(', ')', ':', ','), setas
+# e visibilidade; diretivas, modificadores e @startuml/@enduml são raros.
+# A ordem só pode mudar onde não há sobreposição entre as regras:
+# - SKINPARAM_DIRECTIVE precede ID, que também casaria 'hide' e 'skinparam';
+# - ID não casa um 'o' seguido de '--', que é a seta de agregação 'o--';
+# - ARROW precede NUMBER e VISIBILITY ('--' antes de '-1' e de '-');
+# - STATIC/ABSTRACT_MODIFIER e ARROW ('{o--||', '}o--||') precedem LBRACE e RBRACE.
+# LINE_COMMENT é reconhecido mas não vira token.
+TOKEN_RULES = (
+    ('SKINPARAM_DIRECTIVE', r'(?:hide\s+\w+|skinparam\s+[\w.]+\s+[\w#]+)'),
+    ('ID', r'(?!o--)[a-zA-Z_][a-zA-Z_0-9<>]*'),
+    ('LPAREN', r'\('),
+    ('RPAREN', r'\)'),
+    ('COLON', r':'),
+    ('COMMA', r','),
+    ('ARROW', '|'.join(re.escape(seta) for seta, _ in ARROWS)),
+    ('NUMBER', r'-?\d+(?:\.\d+)?'),
+    ('VISIBILITY', r'[+\#~-]'),
+    # Forma "desenrolada": cada trecho sem aspas nem barra é consumido de uma vez e
+    # só há uma maneira de casar o texto, o que mantém o custo linear mesmo
+    # em strings sem aspas de fechamento
+    ('QUOTED_STRING', r'"[^"\\]*(?:\\.[^"\\]*)*"'),
+    ('STATIC_MODIFIER', r'\{(?:static|classifier)\}'),
+    ('ABSTRACT_MODIFIER', r'\{abstract\}'),
+    ('LBRACE', r'\{'),
+    ('RBRACE', r'\}'),
+    ('EQUALS', r'='),
+    ('LINE_COMMENT', r"'.*"),
+    ('AT_STARTUML', r'@startuml'),
+    ('AT_ENDUML', r'@enduml'),
+    # Diretivas do pré-processador ('!theme', '!include'), que podem ter um argumento
+    ('BANG_DIRECTIVE', r'!\w+'),
+)
 
-def t_AT_ENDUML(t):
-    r'@enduml'
-    return t
-
-def t_PACKAGE(t):
-    r'package'
-    return t
-
-def t_ABSTRACT(t):
-    r'abstract'
-    return t
-
-def t_NOTE(t):
-    r'note'
-    return t
-
-def t_END(t):
-    r'end'
-    return t
-
-def t_CLASS(t):
-    r'class'
-    return t
-
-def t_INTERFACE(t):
-    r'interface'
-    return t
-
-def t_ENUM(t):
-    r'enum'
-    return t
-
-def t_EXTENDS(t):
-    r'extends'
-    return t
-
-def t_IMPLEMENTS(t):
-    r'implements'
-    return t
-
-def t_SKINPARAM_DIRECTIVE(t):
-    r'(!\w+|hide\s+\w+|skinparam\s+[\w.]+\s+[\w#]+)'
-    return t
-
-def t_LINE_COMMENT(t):
-    r"'.*"
-    pass
-
-def t_STATIC_MODIFIER(t):
-    r'\{(static|classifier)\}'
-    t.value = t.value[1:-1]
-    return t
-
-def t_ABSTRACT_MODIFIER(t):
-    r'\{abstract\}'
-    t.value = t.value[1:-1]
-    return t
-
-def t_ARROW_INHERITANCE_LEFT(t):
-    r'<\|--'
-    return t
-
-def t_ARROW_INHERITANCE_RIGHT(t):
-    r'--\|>'
-    return t
-
-def t_ARROW_IMPLEMENTATION_LEFT_STRONG(t):
-    r'<\|\.\.'
-    return t
-
-def t_ARROW_IMPLEMENTATION_RIGHT_STRONG(t):
-    r'\.\.\|>'
-    return t
-    
-def t_ARROW_COMPOSITION_LEFT(t):
-    r'\*--'
-    return t
-
-def t_ARROW_COMPOSITION_RIGHT(t):
-    r'--\*'
-    return t
-
-def t_ARROW_AGGREGATION_LEFT(t):
-    r'o--'
-    return t
-
-def t_ARROW_AGGREGATION_RIGHT(t):
-    r'--o'
-    return t
-
-def t_ARROW_DIRECTED_ASSOCIATION_RIGHT(t):
-    r'-->'
-    return t
-
-def t_ARROW_DIRECTED_ASSOCIATION_LEFT(t):
-    r'<--'
-    return t
-
-def t_ARROW_DIRECTED_DEPENDENCY_RIGHT(t):
-    r'\.\.>'
-    return t
-    
-def t_ARROW_DIRECTED_DEPENDENCY_LEFT(t):
-    r'<\.\.'
-    return t
-
-def t_ARROW_ONE_TO_MANY_LEFT(t):
-    r'\|\|--o\{'
-    return t
-
-def t_ARROW_ONE_TO_MANY_RIGHT(t):
-    r'\}o--\|\|'
-    return t
-
-def t_ARROW_MANY_TO_ONE_LEFT(t):
-    r'\{o--\|\|'
-    return t
-
-def t_ARROW_MANY_TO_ONE_RIGHT(t):
-    r'\|\|--o\{'
-    return t
-
-def t_ARROW_ASSOCIATION_LINE(t):
-    r'--'
-    return t
-
-def t_ARROW_DEPENDENCY_LINE(t):
-    r'\.\.'
-    return t
-
-def t_NUMBER(t):
-    r'-?\d+(\.\d+)?'
-    # Converte para int se for inteiro, senão float
-    if '.' in t.value:
-        t.value = float(t.value)
-    else:
-        t.value = int(t.value)
-    return t
-
-def t_VISIBILITY(t):
-    r'[+\#~-]'
-    return t
-
-def t_ID(t):
-    r'[a-zA-Z_][a-zA-Z_0-9<>]*'
-    return t
-
-def t_QUOTED_STRING(t):
-    r'\"([^\\\"]|(\\.))*\"'
-    t.value = str(t.value[1:-1])
-    return t
-
-t_LBRACE = r'\{'
-t_RBRACE = r'\}'
-t_LPAREN = r'\('
-t_RPAREN = r'\)'
-t_COLON = r':'
-t_COMMA = r','
-t_EQUALS = r'='
-
-def t_newline(t):
-    r'\n+'
-    t.lexer.lineno += len(t.value)
-
-def t_error(t):
-    print(f"Lexer: Caractere ilegal '{t.value[0]}' na linha {t.lexer.lineno} posicao {t.lexpos}")
-    t.lexer.skip(1)
-
-lexer = lex.lex()
+@lru_cache(maxsize=1)
+def build_master() -> 're.Pattern[str]':
+    """
+    Compila a regex única com todas as regras: um só finditer percorre o texto
+    inteiro, em vez de uma tentativa de regex (e uma chamada Python) por regra.
+
+    A compilação acontece no primeiro uso e é memorizada, então importar o
+    lexer não paga por ela e novos lexers reaproveitam a mesma regex.
+    """
+    return re.compile('|'.join(f'(?P<{nome}>{padrao})' for nome, padrao in TOKEN_RULES))
+
+# Tipo do token pelo índice do grupo que casou (m.lastindex). Os nomes são
+# internados, então todos os tokens do mesmo tipo compartilham a mesma string
+# e as comparações no parser terminam já no teste de identidade.
+TOKEN_TYPES = (None,) + tuple(sys.intern(nome) for nome, _ in TOKEN_RULES)
+
+# Valor dos tokens de texto fixo pelo mesmo índice (None nos demais): chaves,
+# {abstract} e diretivas @ não precisam de m.group() nem de classificação.
+_FIXED_VALUES = {
+    'ABSTRACT_MODIFIER': 'abstract', 'LBRACE': '{', 'RBRACE': '}',
+    'AT_STARTUML': '@startuml', 'AT_ENDUML': '@enduml',
+}
+TOKEN_VALUES = (None,) + tuple(_FIXED_VALUES.get(nome) for nome, _ in TOKEN_RULES)
+
+# Token produzido pelo lexer, com os mesmos campos do LexToken do PLY.
+# Uma tupla nomeada é um único objeto por token, sem __dict__.
+Token = namedtuple('Token', 'type value lineno lexpos')
+
+# Constrói a tupla direto pelo construtor em C, sem passar pelo __new__
+# em Python gerado pelo namedtuple
+_new_token = tuple.__new__
+
+
+# Caractere ilegal encontrado pelo lexer: (posicao, caractere, linha)
+LexError = Tuple[int, str, int]
+
+# Tokens de um caractere que nenhuma outra regra pode começar
+_SIMPLES = {'(': 'LPAREN', ')': 'RPAREN', ':': 'COLON', ',': 'COMMA', '=': 'EQUALS'}
+
+# Primeiro caractere de um ID
+_INICIO_ID = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_')
+
+# Prefixos que começam com letra mas podem não ser um ID: as diretivas
+# 'hide'/'skinparam' e a seta de agregação 'o--'
+_PREFIXOS_NAO_ID = ('hide', 'skinparam', 'o--')
+
+_ID = re.compile(r'[a-zA-Z_][a-zA-Z_0-9<>]*')
+
+
+def format_errors(errors: Iterable[LexError]) -> str:
+    """Formata os erros do lexer, uma mensagem por linha."""
+    return ''.join(f"Lexer: Caractere ilegal '{c}' na linha {lineno} posicao {pos}\n"
+                   for pos, c, lineno in errors)
+
+
+def iter_tokens(text: str, lineno: int = 1, errors: Optional[List[LexError]] = None) -> Iterator[Token]:
+    """
+    Gera os tokens de um código PlantUML.
+
+    O scanner decide pelo caractere atual: espaços, quebras de linha, a
+    pontuação de um caractere e os identificadores (os casos mais comuns) são
+    tratados direto; o resto passa pela regex única, que aplica as regras de
+    TOKEN_RULES na mesma ordem de precedência. Caracteres que nenhuma regra
+    aceita são descartados e acumulados em `errors`. Sem uma lista, os erros
+    são escritos de uma só vez no stdout ao fim da geração, e não com um print
+    por caractere dentro do laço.
+    """
+    if errors is None:
+        errors = []
+        try:
+            yield from iter_tokens(text, lineno, errors)
+        finally:
+            if errors:
+                sys.stdout.write(format_errors(errors))
+        return
+    master = build_master().match
+    id_match = _ID.match
+    intern = sys.intern
+    n = len(text)
+    pos = 0
+    while pos < n:
+        c = text[pos]
+        if c == ' ' or c == '\t':
+            pos += 1
+            continue
+        if c == '\n':
+            lineno += 1
+            pos += 1
+            continue
+        kind = _SIMPLES.get(c)
+        if kind is not None:
+            yield _new_token(Token, (kind, c, lineno, pos))
+            pos += 1
+            continue
+        if c in _INICIO_ID and not text.startswith(_PREFIXOS_NAO_ID, pos):
+            m = id_match(text, pos)
+            # Identificadores se repetem muito (tipos, nomes de classes)
+            value = intern(m.group())
+            yield _new_token(Token, (KEYWORDS.get(value, 'ID'), value, lineno, pos))
+            pos = m.end()
+            continue
+        m = master(text, pos)
+        if m is None:
+            # Espaços e quebras de linha já foram consumidos acima
+            errors.append((pos, c, lineno))
+            pos += 1
+            continue
+        start = pos
+        pos = m.end()
+        grupo = m.lastindex
+        kind = TOKEN_TYPES[grupo]
+        value = TOKEN_VALUES[grupo]
+        if value is not None:
+            yield _new_token(Token, (kind, value, lineno, start))
+            continue
+        value = m.group()
+        if kind == 'ARROW':
+            value = intern(value)
+            yield _new_token(Token, (ARROW_MAP[value], value, lineno, start))
+            continue
+        if kind == 'LINE_COMMENT':
+            continue
+        linha = lineno
+        # Strings e diretivas podem conter quebras de linha
+        lineno += value.count('\n')
+        if kind == 'ID':
+            value = intern(value)
+            kind = KEYWORDS.get(value, 'ID')
+        elif kind == 'QUOTED_STRING':
+            value = value[1:-1]
+        elif kind == 'NUMBER':
+            # Converte para int se for inteiro, senão float
+            value = float(value) if '.' in value else int(value)
+        elif kind == 'STATIC_MODIFIER' or kind == 'ABSTRACT_MODIFIER':
+            value = MODIFIERS[value]
+        yield _new_token(Token, (kind, value, linha, start))
+
+
+class PlantUMLLexer:
+    """
+    Lexer com a mesma interface do PLY (lineno, input() e token()).
+
+    Os caracteres ilegais da última entrada ficam em `errors`, para serem
+    reportados por quem usa o lexer.
+    """
+
+    def __init__(self):
+        self.lineno = 1
+        self.errors: List[LexError] = []
+        self._tokens: Iterator[Token] = iter(())
+
+    def input(self, data: str):
+        self.errors = []
+        self._tokens = iter_tokens(data, self.lineno, self.errors)
+
+    def token(self) -> Optional[Token]:
+        return next(self._tokens, None)
+
+    def clone(self) -> 'PlantUMLLexer':
+        """Cria um lexer novo, sem entrada, que reaproveita a regex já compilada."""
+        novo = PlantUMLLexer()
+        novo.lineno = self.lineno
+        return novo
+
+
+lexer = PlantUMLLexer()
 
 PLANTUML_EXEMPLO_TESTE_LEXER = """
 @startuml TestLexerLexerV4
@@ -238,10 +320,11 @@ ClasseP <|.. ClasseQ : impl_esquerda_label
 
 if __name__ == '__main__':
     lexer.input(PLANTUML_EXEMPLO_TESTE_LEXER)
-    print("--- Testando Lexer Isoladamente (REGRAS DE SETA COMO FUNÇÕES E REORDENADAS) ---")
+    print("--- Testando Lexer Isoladamente ---")
     while True:
         tok = lexer.token()
         if not tok:
             break
         print(tok)
+    print(format_errors(lexer.errors), end='')
     print("--- Fim Teste Lexer ---")
\ No newline at end of file
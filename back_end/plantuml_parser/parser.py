@@ -3,41 +3,141 @@ Parser para diagramas PlantUML focado em diagramas de classe.
 
 Transforma o código PlantUML em estruturas Python para posterior geração de código.
 """
-from typing import List, Any, Optional
+from functools import lru_cache
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
 from .data_structures import (
     PlantUMLDiagrama, PlantUMLClasse, PlantUMLAtributo, PlantUMLMetodo,
     PlantUMLParametro, PlantUMLPacote, PlantUMLEnum, PlantUMLInterface,
-    PlantUMLRelacionamento
+    PlantUMLRelacionamento, PlantUMLEstruturaBase
 )
-from .lexer import lexer 
-import ply.lex as lex 
+from .lexer import LexError, Token, format_errors, iter_tokens
 import re
 
 
+# Tipo de relacionamento pelo tipo do token da seta
+_TIPO_POR_SETA = {
+    'ARROW_INHERITANCE_LEFT': "heranca",
+    'ARROW_INHERITANCE_RIGHT': "heranca",
+    'ARROW_IMPLEMENTATION_LEFT_STRONG': "implementacao",
+    'ARROW_IMPLEMENTATION_RIGHT_STRONG': "implementacao",
+    'ARROW_COMPOSITION_LEFT': "composicao",
+    'ARROW_COMPOSITION_RIGHT': "composicao",
+    'ARROW_AGGREGATION_LEFT': "agregacao",
+    'ARROW_AGGREGATION_RIGHT': "agregacao",
+    # Relacionamentos one-to-many e many-to-one
+    'ARROW_ONE_TO_MANY_LEFT': "associacao",
+    'ARROW_ONE_TO_MANY_RIGHT': "associacao",
+    'ARROW_MANY_TO_ONE_LEFT': "associacao",
+    'ARROW_MANY_TO_ONE_RIGHT': "associacao",
+    # Dependências (pontilhadas)
+    'ARROW_DIRECTED_DEPENDENCY_LEFT': "dependencia",
+    'ARROW_DIRECTED_DEPENDENCY_RIGHT': "dependencia",
+    'ARROW_DEPENDENCY_LINE': "dependencia",
+    # Associações (linhas contínuas)
+    'ARROW_DIRECTED_ASSOCIATION_RIGHT': "associacao",
+    'ARROW_DIRECTED_ASSOCIATION_LEFT': "associacao",
+    'ARROW_ASSOCIATION_LINE': "associacao",
+}
+
+# Tipos de token que são setas de relacionamento
+ARROW_TYPES = frozenset(_TIPO_POR_SETA)
+
+# Conjuntos de tipos de token usados nos testes de pertinência do parser
+_NAME_TYPES = frozenset({'ID', 'QUOTED_STRING'})
+_NAME_OR_LBRACE_TYPES = _NAME_TYPES | {'LBRACE'}
+_DEFAULT_VALUE_TYPES = _NAME_TYPES | {'NUMBER'}
+_STRUCT_DECL_TYPES = frozenset({'CLASS', 'INTERFACE'})
+_MEMBER_START_TYPES = frozenset({'VISIBILITY', 'STATIC_MODIFIER', 'ABSTRACT_MODIFIER', 'ID', 'QUOTED_STRING'})
+
+# Mesmo mapeamento pelo texto da seta, para tokens cujo tipo não está na tabela acima
+_TIPO_POR_TEXTO_SETA = {
+    "<|--": "heranca", "--|>": "heranca",
+    "<|..": "implementacao", "..|>": "implementacao",
+    "*--": "composicao", "--*": "composicao",
+    "o--": "agregacao", "--o": "agregacao",
+    "||--o{": "associacao", "}o--||": "associacao", "{o--||": "associacao",
+    "<..": "dependencia", "..>": "dependencia", "..": "dependencia",
+    "-->": "associacao", "<--": "associacao", "--": "associacao",
+}
+
+
+@lru_cache(maxsize=128)
+def _tokenizar(plantuml_code: str) -> Tuple[Tuple[Token, ...], Tuple[str, ...], Tuple[LexError, ...]]:
+    """
+    Gera os tokens, seus tipos e os erros léxicos de um código PlantUML,
+    memorizando o resultado: parsear de novo o mesmo código (reenvios na
+    interface, testes) não refaz a análise léxica. Tudo é tupla imutável,
+    então pode ser compartilhado entre parses.
+    """
+    erros: List[LexError] = []
+    tokens = tuple(iter_tokens(plantuml_code, errors=erros))
+    return tokens, tuple([token.type for token in tokens]), tuple(erros)
+
+
+def _reportar_erros(erros: Tuple[LexError, ...], errors: Optional[List[LexError]] = None):
+    """
+    Acrescenta os erros léxicos à lista `errors`, como no iter_tokens; sem uma
+    lista, escreve-os no stdout de uma só vez, se houver algum.
+    """
+    if errors is not None:
+        errors.extend(erros)
+    elif erros:
+        sys.stdout.write(format_errors(erros))
+
+
 class PlantUMLParser:
     """
     Faz o parsing dos tokens do PlantUML e monta o objeto PlantUMLDiagrama.
     """
+
+    # Atributos fixos: acessados a cada token, ficam em slots e não num __dict__
+    __slots__ = ('tokens', 'token_types', 'token_idx', '_tokens_len', 'diagrama',
+                 'contexto_atual_pilha', '_relacionamentos_criados')
     
     def __init__(self):
         """
         Inicializa uma nova instância do PlantUMLParser.
         """
-        self.tokens: List[lex.LexToken] = []
+        self.tokens: Tuple[Token, ...] = ()
+        # Tipos dos tokens em paralelo a self.tokens: as decisões que só olham o
+        # tipo leem esta sequência, sem passar pelo token
+        self.token_types: Tuple[str, ...] = ()
         self.token_idx: int = 0
+        # len(self.tokens), calculado uma vez por parse
+        self._tokens_len: int = 0
         self.diagrama: PlantUMLDiagrama = PlantUMLDiagrama()
         self.contexto_atual_pilha: List[Any] = []
+        # Relacionamentos já criados no diagrama atual, pela tupla dos seus campos
+        self._relacionamentos_criados: Dict[tuple, PlantUMLRelacionamento] = {}
 
-    def _peek_token(self, offset: int = 0) -> Optional[lex.LexToken]:
+    def _peek_token(self, offset: int = 0) -> Optional[Token]:
         """Espia o token atual ou um token futuro sem consumi-lo."""
         idx = self.token_idx + offset
-        if 0 <= idx < len(self.tokens):
+        if 0 <= idx < self._tokens_len:
             return self.tokens[idx]
         return None
 
-    def _consume_token(self, expected_type: Optional[str] = None) -> lex.LexToken:
+    def _peek0(self) -> Optional[Token]:
+        """Versão de _peek_token sem deslocamento, o caso mais comum."""
+        idx = self.token_idx
+        return self.tokens[idx] if idx < self._tokens_len else None
+
+    def _peek_type(self, offset: int = 0) -> Optional[str]:
+        """Espia só o tipo do token atual ou de um token futuro (None no fim da entrada)."""
+        idx = self.token_idx + offset
+        if 0 <= idx < self._tokens_len:
+            return self.token_types[idx]
+        return None
+
+    def _consume_token(self, expected_type: Optional[str] = None) -> Token:
         """Consome o token atual e avança. Levanta erro se não for o tipo esperado."""
-        if self.token_idx < len(self.tokens):
+        if self.token_idx < self._tokens_len:
             token = self.tokens[self.token_idx]
             if expected_type and token.type != expected_type:
                 self._parse_error(f"Esperado token {expected_type}, mas encontrou {token.type} ('{token.value}')")
@@ -46,14 +146,27 @@ class PlantUMLParser:
         self._parse_error("Fim inesperado da entrada de tokens.")
         raise RuntimeError("Esta linha não deveria ser alcançada.")
 
+    def _consume_any(self) -> Token:
+        """Versão de _consume_token sem tipo esperado: consome o token atual, qualquer que seja."""
+        idx = self.token_idx
+        if idx < self._tokens_len:
+            self.token_idx = idx + 1
+            return self.tokens[idx]
+        self._parse_error("Fim inesperado da entrada de tokens.")
+        raise RuntimeError("Esta linha não deveria ser alcançada.")
 
     def _parse_error(self, message: str):
         """Lança um erro de sintaxe com informações da linha atual."""
-        token_para_linha = self._peek_token() or (self.tokens[self.token_idx -1] if self.token_idx > 0 and self.tokens else None)
+        token_para_linha = self._peek0() or (self.tokens[self.token_idx -1] if self.token_idx > 0 and self.tokens else None)
         line = token_para_linha.lineno if token_para_linha else self.tokens[0].lineno if self.tokens else 'desconhecida'
         val = token_para_linha.value if token_para_linha else "EOF"
         raise SyntaxError(f"Erro de sintaxe na linha {line} perto de '{val}': {message}")
 
+    def _erro_membro_inesperado(self, descricao: str, inicio: int, estrutura: Any):
+        """Lança o erro de membro inválido; a mensagem (com a introspecção da estrutura) só é montada aqui."""
+        token = self.tokens[inicio]
+        self._parse_error(f"{descricao} '{token.value}' ({token.type}) em {type(estrutura).__name__} {estrutura.nome}")
+
     def _obter_contexto_atual(self) -> Any:
         """Retorna o topo da pilha de contexto, se houver."""
         if self.contexto_atual_pilha:
@@ -62,66 +175,57 @@ class PlantUMLParser:
 
     def _adicionar_elemento_ao_contexto_ou_diagrama(self, elemento: Any):
         """Adiciona um elemento ao contexto atual (pacote) ou ao diagrama principal."""
-        contexto = self._obter_contexto_atual()
-        if contexto and isinstance(contexto, PlantUMLPacote):
-            contexto.adicionar_elemento(elemento)
-        else:
-            self.diagrama.adicionar_elemento(elemento)
+        # Só pacotes contêm elementos, e o próprio alvo distribui o elemento por tipo
+        pilha = self.contexto_atual_pilha
+        alvo = pilha[-1] if pilha else self.diagrama
+        # Verificação apenas de depuração (removida com -O)
+        assert isinstance(alvo, (PlantUMLPacote, PlantUMLDiagrama)), f"Contexto inesperado para elementos: {alvo!r}"
+        alvo.adicionar_elemento(elemento)
     
     def _traduzir_seta_para_tipo_relacionamento(self, seta_token_type: str, seta_value: str) -> str:
         """
         Traduz o TIPO e VALOR do token da seta para um tipo de relacionamento textual.
-        Ajustado para dar prioridade e corrigir mapeamentos.
+        O tipo do token tem prioridade; o texto da seta é o fallback.
         """
-        # Prioridade para setas mais específicas baseadas no valor e depois no tipo
-        if seta_token_type == 'ARROW_INHERITANCE_LEFT' or seta_value == "<|--": return "heranca"
-        if seta_token_type == 'ARROW_INHERITANCE_RIGHT' or seta_value == "--|>": return "heranca"
-        
-        if seta_token_type == 'ARROW_IMPLEMENTATION_LEFT_STRONG' or seta_value == "<|..": return "implementacao"
-        if seta_token_type == 'ARROW_IMPLEMENTATION_RIGHT_STRONG' or seta_value == "..|>": return "implementacao"
-        
-        if seta_token_type == 'ARROW_COMPOSITION_LEFT' or seta_value == "*--": return "composicao"
-        if seta_token_type == 'ARROW_COMPOSITION_RIGHT' or seta_value == "--*": return "composicao"
-        
-        if seta_token_type == 'ARROW_AGGREGATION_LEFT' or seta_value == "o--": return "agregacao"
-        if seta_token_type == 'ARROW_AGGREGATION_RIGHT' or seta_value == "--o": return "agregacao"
-
-        # Relacionamentos one-to-many e many-to-one
-        if seta_token_type == 'ARROW_ONE_TO_MANY_LEFT' or seta_value == "||--o{": return "associacao"
-        if seta_token_type == 'ARROW_ONE_TO_MANY_RIGHT' or seta_value == "}o--||": return "associacao"
-        if seta_token_type == 'ARROW_MANY_TO_ONE_LEFT' or seta_value == "{o--||": return "associacao"
-        if seta_token_type == 'ARROW_MANY_TO_ONE_RIGHT' or seta_value == "||--o{": return "associacao"
-
-        # Dependências (pontilhadas)
-        if seta_token_type == 'ARROW_DIRECTED_DEPENDENCY_LEFT' or seta_value == "<..": return "dependencia"
-        if seta_token_type == 'ARROW_DIRECTED_DEPENDENCY_RIGHT' or seta_value == "..>": return "dependencia"
-        if seta_token_type == 'ARROW_DEPENDENCY_LINE' or seta_value == "..": return "dependencia"
-        
-        # Associações (linhas contínuas) - por último como fallback para linhas
-        if seta_token_type == 'ARROW_DIRECTED_ASSOCIATION_RIGHT' or seta_value == "-->": return "associacao"
-        if seta_token_type == 'ARROW_DIRECTED_ASSOCIATION_LEFT' or seta_value == "<--": return "associacao"
-        if seta_token_type == 'ARROW_ASSOCIATION_LINE' or seta_value == "--": return "associacao"
-        
-        return "associacao_desconhecida"
+        return _TIPO_POR_SETA.get(seta_token_type) or _TIPO_POR_TEXTO_SETA.get(seta_value, "associacao_desconhecida")
+
+
+    def _criar_relacionamento(self, origem: str, destino: str, tipo: str, label: Optional[str] = None,
+                              cardinalidade_origem: Optional[str] = None,
+                              cardinalidade_destino: Optional[str] = None) -> PlantUMLRelacionamento:
+        """
+        Cria um relacionamento ou devolve o objeto idêntico já criado neste diagrama.
 
+        Arestas repetidas passam a ser o mesmo objeto, o que evita alocações e
+        permite reconhecer duplicatas com 'is'. Os relacionamentos não são
+        alterados depois de criados, então o compartilhamento é seguro.
+        """
+        chave = (origem, destino, tipo, label, cardinalidade_origem, cardinalidade_destino)
+        relacionamento = self._relacionamentos_criados.get(chave)
+        if relacionamento is None:
+            relacionamento = PlantUMLRelacionamento(*chave)
+            self._relacionamentos_criados[chave] = relacionamento
+        return relacionamento
 
     def _parse_parametros_metodo(self) -> List[PlantUMLParametro]:
         """Parseia a lista de parâmetros de um método: (param1: Tipo1, param2: Tipo2)."""
         params = []
         self._consume_token('LPAREN')
-        while self._peek_token() and self._peek_token().type != 'RPAREN':
+        while (proximo := self._peek0()) and proximo.type != 'RPAREN':
             # Nome do parâmetro
-            if self._peek_token().type not in ['ID', 'QUOTED_STRING']:
-                 self._parse_error(f"Esperado nome de parâmetro (ID ou QUOTED_STRING), encontrou {self._peek_token().type}")
-            nome_param_token = self._consume_token()
+            if proximo.type not in _NAME_TYPES:
+                 self._parse_error(f"Esperado nome de parâmetro (ID ou QUOTED_STRING), encontrou {proximo.type}")
+            nome_param_token = self._consume_any()
             nome_param = nome_param_token.value
             tipo_param = None
             # Tipo do parâmetro (opcional)
-            if self._peek_token() and self._peek_token().type == 'COLON':
+            proximo = self._peek0()
+            if proximo and proximo.type == 'COLON':
                 self._consume_token('COLON')
-                if not self._peek_token() or self._peek_token().type not in ['ID', 'QUOTED_STRING']:
+                proximo = self._peek0()
+                if not proximo or proximo.type not in _NAME_TYPES:
                     self._parse_error(f"Esperado tipo para o parametro {nome_param}")
-                tipo_param_token = self._consume_token()
+                tipo_param_token = self._consume_any()
                 tipo_param = tipo_param_token.value # Pode ser ID (TipoSimples) ou QUOTED_STRING (List<Tipo>)
                 # Se o tipo for um ID e o próximo for '<', é um tipo genérico que o lexer pegou como ID.
                 # Ex: ID<ID> -> ID('<') ID('>')
@@ -129,80 +233,94 @@ class PlantUMLParser:
                 # Por agora, o lexer t_ID tenta pegar 'Nome<Generico>' como um único ID.
             params.append(PlantUMLParametro(nome=nome_param, tipo=tipo_param))
             
-            if self._peek_token() and self._peek_token().type == 'COMMA':
+            proximo = self._peek0()
+            if proximo and proximo.type == 'COMMA':
                 self._consume_token('COMMA')
-            elif self._peek_token() and self._peek_token().type != 'RPAREN':
+            elif proximo and proximo.type != 'RPAREN':
                 self._parse_error("Esperado ',' ou ')' na lista de parâmetros.")
         self._consume_token('RPAREN')
         return params
 
-    def _parse_atributo_ou_metodo(self, estrutura_pai: Any):
-        """Parseia um atributo ou um método."""
+    def _parse_atributo_ou_metodo(self, estrutura_pai: PlantUMLEstruturaBase):
+        """
+        Parseia um atributo ou um método.
+
+        `estrutura_pai` é sempre uma classe, interface ou enum, e todas herdam
+        adicionar_atributo/adicionar_metodo de PlantUMLEstruturaBase.
+        """
         visibilidade = None
         is_static = False
         is_abstract = False
 
         # 1. Visibilidade (opcional)
-        if self._peek_token() and self._peek_token().type == 'VISIBILITY':
+        proximo = self._peek0()
+        if proximo and proximo.type == 'VISIBILITY':
             visibilidade = self._consume_token('VISIBILITY').value
+            proximo = self._peek0()
         
         # 2. Modificadores {static} ou {abstract} (opcionais)
-        if self._peek_token() and self._peek_token().type == 'STATIC_MODIFIER':
+        if proximo and proximo.type == 'STATIC_MODIFIER':
             self._consume_token('STATIC_MODIFIER')
             is_static = True
         # {abstract} pode ser para método ou para classe/interface.
         # Se for seguido por 'class' ou 'interface', não é um modificador de membro.
-        elif self._peek_token() and self._peek_token().type == 'ABSTRACT_MODIFIER':
+        elif proximo and proximo.type == 'ABSTRACT_MODIFIER':
             # Verifique se o próximo token NÃO é CLASS ou INTERFACE
             # Se for, este {abstract} pertence à declaração da estrutura, não a um membro.
             prox_token_apos_abstract_modifier = self._peek_token(1) # Olhamos um token à frente do {abstract}
-            if not (prox_token_apos_abstract_modifier and prox_token_apos_abstract_modifier.type in ['CLASS', 'INTERFACE']):
+            if not (prox_token_apos_abstract_modifier and prox_token_apos_abstract_modifier.type in _STRUCT_DECL_TYPES):
                 self._consume_token('ABSTRACT_MODIFIER')
                 is_abstract = True
         
         # 3. Nome do membro (ID ou QUOTED_STRING)
-        if not self._peek_token() or self._peek_token().type not in ['ID', 'QUOTED_STRING']:
+        proximo = self._peek0()
+        if not proximo or proximo.type not in _NAME_TYPES:
             # Se o que veio antes foi um modificador e não há nome, é um erro.
             if is_static or is_abstract or visibilidade:
-                 self._parse_error(f"Esperado nome para atributo/método após modificadores/visibilidade, encontrou {self._peek_token().type if self._peek_token() else 'EOF'}")
+                 self._parse_error(f"Esperado nome para atributo/método após modificadores/visibilidade, encontrou {proximo.type if proximo else 'EOF'}")
             else: # Pode não ser um membro, então apenas retorna para o loop principal do parse tentar outras regras
                 return False # Indica que não parseou um membro
 
-        nome_membro_token = self._consume_token()
+        nome_membro_token = self._consume_any()
         nome_membro = nome_membro_token.value
 
         # 4. Determinar se é método (tem parênteses) ou atributo
-        if self._peek_token() and self._peek_token().type == 'LPAREN': # É um método
+        proximo = self._peek0()
+        if proximo and proximo.type == 'LPAREN': # É um método
             parametros = self._parse_parametros_metodo()
             tipo_retorno = None
-            if self._peek_token() and self._peek_token().type == 'COLON':
+            proximo = self._peek0()
+            if proximo and proximo.type == 'COLON':
                 self._consume_token('COLON')
-                if not self._peek_token() or self._peek_token().type not in ['ID', 'QUOTED_STRING']:
+                proximo = self._peek0()
+                if not proximo or proximo.type not in _NAME_TYPES:
                      self._parse_error(f"Esperado tipo de retorno para o metodo {nome_membro}")
-                tipo_retorno_token = self._consume_token()
+                tipo_retorno_token = self._consume_any()
                 tipo_retorno = tipo_retorno_token.value # Pode ser ID (TipoSimples) ou QUOTED_STRING (List<Tipo>)
             
             if visibilidade is None: visibilidade = "+" 
             metodo = PlantUMLMetodo(nome=nome_membro, parametros=parametros, tipo_retorno=tipo_retorno,
                                     visibilidade=visibilidade, is_static=is_static, is_abstract=is_abstract)
-            if hasattr(estrutura_pai, 'metodos'):
-                estrutura_pai.metodos.append(metodo)
+            estrutura_pai.adicionar_metodo(metodo)
             return True
         else: # É um atributo
             tipo_atributo = None
             valor_default = None
-            if self._peek_token() and self._peek_token().type == 'COLON':
+            if proximo and proximo.type == 'COLON':
                 self._consume_token('COLON')
-                if not self._peek_token() or self._peek_token().type not in ['ID', 'QUOTED_STRING']:
+                proximo = self._peek0()
+                if not proximo or proximo.type not in _NAME_TYPES:
                     self._parse_error(f"Esperado tipo para o atributo {nome_membro}")
-                tipo_atributo_token = self._consume_token()
+                tipo_atributo_token = self._consume_any()
                 tipo_atributo = tipo_atributo_token.value # Pode ser ID (TipoSimples) ou QUOTED_STRING (List<Tipo>)
+                proximo = self._peek0()
             
-            if self._peek_token() and self._peek_token().type == 'EQUALS':
+            if proximo and proximo.type == 'EQUALS':
                 self._consume_token('EQUALS')
-                if not self._peek_token() or self._peek_token().type not in ['ID', 'QUOTED_STRING', 'NUMBER']: 
+                proximo = self._peek0()
+                if not proximo or proximo.type not in _DEFAULT_VALUE_TYPES: 
                      self._parse_error(f"Esperado valor default para o atributo {nome_membro}")
-                valor_default_token = self._consume_token() 
+                valor_default_token = self._consume_any() 
                 valor_default = valor_default_token.value
 
             if visibilidade is None: visibilidade = "+"
@@ -210,203 +328,208 @@ class PlantUMLParser:
             # A flag is_static que pegamos no início da função era para este membro.
             atributo = PlantUMLAtributo(nome=nome_membro, tipo=tipo_atributo, visibilidade=visibilidade,
                                         default_value=valor_default, is_static=is_static) # Usar o is_static correto
-            if hasattr(estrutura_pai, 'atributos'):
-                estrutura_pai.atributos.append(atributo)
+            estrutura_pai.adicionar_atributo(atributo)
             return True
         return False # Se não conseguiu parsear como atributo ou método
 
 
+    def _parse_valor_enum(self, enum: PlantUMLEnum):
+        """Parseia um valor de enum (um ID) e a vírgula que o separa do próximo, se houver."""
+        valor_enum = self._consume_token('ID').value
+        enum.adicionar_valor(valor_enum)
+        enum.adicionar_atributo(PlantUMLAtributo(nome=valor_enum, visibilidade="+"))
+        if self._peek_type() == 'COMMA':
+            self._consume_token('COMMA')
+
     def _parse_membros_estrutura(self, estrutura_atual: Any):
-        """Parseia os membros (atributos, métodos, valores de enum) dentro de um bloco {}."""
-        while self._peek_token() and self._peek_token().type != 'RBRACE':
-            token_membro_inicio = self._peek_token()
-            if isinstance(estrutura_atual, PlantUMLEnum):
-                if token_membro_inicio.type == 'ID':
-                    # Parsear múltiplos valores de enum separados por vírgula
-                    while self._peek_token() and self._peek_token().type == 'ID':
-                        valor_enum = self._consume_token('ID').value
-                        if hasattr(estrutura_atual, 'valores_enum'): 
-                            estrutura_atual.valores_enum.append(valor_enum)
-                            estrutura_atual.atributos.append(PlantUMLAtributo(nome=valor_enum, visibilidade="+"))
-                        
-                        # Verificar se há vírgula para próximo valor
-                        if self._peek_token() and self._peek_token().type == 'COMMA':
-                            self._consume_token('COMMA')  # Consume a vírgula
-                            # Continuar o loop para pegar o próximo ID
-                        else:
-                            break  # Não há mais valores
-                elif token_membro_inicio.type == 'RBRACE': 
-                    break
+        """Parseia os membros (atributos, métodos, valores de enum) dentro de um bloco {}, um por vez."""
+        # O tipo da estrutura não muda dentro do bloco: é verificado uma vez, não a cada membro
+        is_enum = isinstance(estrutura_atual, PlantUMLEnum)
+        if not is_enum and not isinstance(estrutura_atual, (PlantUMLClasse, PlantUMLInterface)):
+            # Não deveria acontecer se o contexto está correto
+            self._parse_error(f"Tentando parsear membros em um contexto inesperado: {type(estrutura_atual)}")
+        while (tipo_membro := self._peek_type()) and tipo_membro != 'RBRACE':
+            # Posição do início do membro, para as mensagens de erro
+            inicio = self.token_idx
+            if is_enum:
+                if tipo_membro == 'ID':
+                    self._parse_valor_enum(estrutura_atual)
                 else:
-                    self._parse_error(f"Esperado ID para valor de enum ou '}}', encontrou {token_membro_inicio.type}")
-            elif isinstance(estrutura_atual, (PlantUMLClasse, PlantUMLInterface)):
-                if token_membro_inicio.type in ['VISIBILITY', 'STATIC_MODIFIER', 'ABSTRACT_MODIFIER', 'ID', 'QUOTED_STRING']:
+                    self._parse_error(f"Esperado ID para valor de enum ou '}}', encontrou {tipo_membro}")
+            else:
+                if tipo_membro in _MEMBER_START_TYPES:
                     if not self._parse_atributo_ou_metodo(estrutura_atual):
                         # Se _parse_atributo_ou_metodo retornar False, significa que não consumiu o token
                         # e não era um membro válido. Pode ser um erro ou algo inesperado.
-                        self._parse_error(f"Sintaxe de membro inválida ou token inesperado '{token_membro_inicio.value}' ({token_membro_inicio.type}) em {type(estrutura_atual).__name__} {estrutura_atual.nome}")
+                        self._erro_membro_inesperado("Sintaxe de membro inválida ou token inesperado", inicio, estrutura_atual)
                 else: # Se não começar com um token esperado para membro
-                    self._parse_error(f"Início de membro inesperado '{token_membro_inicio.value}' ({token_membro_inicio.type}) em {type(estrutura_atual).__name__} {estrutura_atual.nome}")
-            else: # Não deveria acontecer se o contexto está correto
-                self._parse_error(f"Tentando parsear membros em um contexto inesperado: {type(estrutura_atual)}")
+                    self._erro_membro_inesperado("Início de membro inesperado", inicio, estrutura_atual)
         
         # Não consumir '}' aqui, o loop principal do parse ou _parse_declaracao_estrutura (se for bloco) o fará.
 
     def _parse_declaracao_estrutura(self):
         """Parseia uma declaração de classe, interface ou enum."""
         is_abstract_structure = False
-        if self._peek_token() and self._peek_token().type == 'ABSTRACT':
-            if self._peek_token(1) and self._peek_token(1).type in ['CLASS', 'INTERFACE']:
+        proximo = self._peek0()
+        if proximo and proximo.type == 'ABSTRACT':
+            seguinte = self._peek_token(1)
+            if seguinte and seguinte.type in _STRUCT_DECL_TYPES:
                 self._consume_token('ABSTRACT')
                 is_abstract_structure = True
 
-        tipo_estrutura_token = self._peek_token()
+        tipo_estrutura_token = self._peek0()
         if not tipo_estrutura_token: self._parse_error("Esperada declaração de estrutura.")
+        tipo_estrutura = tipo_estrutura_token.type
 
-        nome_estrutura: str = "_NomePadrao" # Default
-        elemento_novo: Any = None
-        
-        if tipo_estrutura_token.type == 'CLASS':
-            self._consume_token('CLASS')
-            nome_token = self._consume_token()
-            if nome_token.type not in ['ID', 'QUOTED_STRING']: self._parse_error(f"Esperado nome para CLASS, encontrou {nome_token.type}")
-            nome_estrutura = nome_token.value
-            
-            pai = None
-            interfaces = []
-            if self._peek_token() and self._peek_token().type == 'EXTENDS':
-                self._consume_token('EXTENDS')
-                pai_token = self._consume_token()
-                if pai_token.type not in ['ID', 'QUOTED_STRING']: self._parse_error("Nome inválido para classe pai.")
-                pai = pai_token.value
-            
-            if self._peek_token() and self._peek_token().type == 'IMPLEMENTS':
-                self._consume_token('IMPLEMENTS')
-                while self._peek_token() and self._peek_token().type in ['ID', 'QUOTED_STRING']:
-                    iface_token = self._consume_token()
-                    interfaces.append(iface_token.value)
-                    if self._peek_token() and self._peek_token().type == 'COMMA':
-                        self._consume_token('COMMA')
-                    elif self._peek_token() and self._peek_token().type not in ['ID', 'QUOTED_STRING', 'LBRACE']:
-                        break 
-                    elif not (self._peek_token() and self._peek_token().type in ['ID', 'QUOTED_STRING']):
-                        break
-            elemento_novo = PlantUMLClasse(nome=nome_estrutura, is_abstract=is_abstract_structure, classe_pai=pai, interfaces_implementadas=interfaces)
-        
-        elif tipo_estrutura_token.type == 'INTERFACE':
-            self._consume_token('INTERFACE')
-            nome_token = self._consume_token()
-            if nome_token.type not in ['ID', 'QUOTED_STRING']: self._parse_error(f"Nome inválido para interface.")
-            nome_estrutura = nome_token.value
-            interfaces_pai = []
-            if self._peek_token() and self._peek_token().type == 'EXTENDS':
-                self._consume_token('EXTENDS')
-                while self._peek_token() and self._peek_token().type in ['ID', 'QUOTED_STRING']:
-                    iface_pai_token = self._consume_token()
-                    interfaces_pai.append(iface_pai_token.value)
-                    if self._peek_token() and self._peek_token().type == 'COMMA':
-                        self._consume_token('COMMA')
-                    elif self._peek_token() and self._peek_token().type not in ['ID', 'QUOTED_STRING', 'LBRACE']:
-                        break
-                    elif not (self._peek_token() and self._peek_token().type in ['ID', 'QUOTED_STRING']):
-                        break
-            elemento_novo = PlantUMLInterface(nome=nome_estrutura, interfaces_pai=interfaces_pai)
-
-        elif tipo_estrutura_token.type == 'ENUM':
-            self._consume_token('ENUM')
-            nome_token = self._consume_token()
-            if nome_token.type not in ['ID', 'QUOTED_STRING']: self._parse_error(f"Nome inválido para enum.")
-            nome_estrutura = nome_token.value
-            elemento_novo = PlantUMLEnum(nome=nome_estrutura)
-        else:
+        tratar_estrutura = _DESPACHO_ESTRUTURA.get(tipo_estrutura)
+        if tratar_estrutura is None:
             if is_abstract_structure: 
-                self._parse_error(f"Esperado CLASS ou INTERFACE após ABSTRACT, mas encontrou {tipo_estrutura_token.type if tipo_estrutura_token else 'EOF'}")
+                self._parse_error(f"Esperado CLASS ou INTERFACE após ABSTRACT, mas encontrou {tipo_estrutura}")
             else:
-                self._parse_error(f"Tipo de estrutura desconhecido ou inesperado: {tipo_estrutura_token.type if tipo_estrutura_token else 'EOF'}")
-
-        if elemento_novo:
-            self._adicionar_elemento_ao_contexto_ou_diagrama(elemento_novo)
-            if self._peek_token() and self._peek_token().type == 'LBRACE':
-                self._consume_token('LBRACE')
-                self.contexto_atual_pilha.append(elemento_novo)
-                self._parse_membros_estrutura(elemento_novo) 
-                # O '}' que fecha o bloco da estrutura deve ser consumido pelo loop principal do parse,
-                # que então desempilhará o contexto.
-            # Se não houver LBRACE, a estrutura é declarada e considerada fechada (sem corpo de membros aqui).
+                self._parse_error(f"Tipo de estrutura desconhecido ou inesperado: {tipo_estrutura}")
+        elemento_novo = tratar_estrutura(self, is_abstract_structure)
+
+        self._adicionar_elemento_ao_contexto_ou_diagrama(elemento_novo)
+        proximo = self._peek0()
+        if proximo and proximo.type == 'LBRACE':
+            self._consume_token('LBRACE')
+            self.contexto_atual_pilha.append(elemento_novo)
+            self._parse_membros_estrutura(elemento_novo) 
+            # O '}' que fecha o bloco da estrutura deve ser consumido pelo loop principal do parse,
+            # que então desempilhará o contexto.
+        # Se não houver LBRACE, a estrutura é declarada e considerada fechada (sem corpo de membros aqui).
+
+    def _parse_lista_nomes(self) -> List[str]:
+        """Parseia uma lista de nomes (IMPLEMENTS/EXTENDS), separados ou não por vírgula."""
+        nomes = []
+        while self._peek_type() in _NAME_TYPES:
+            nomes.append(self._consume_any().value)
+            if self._peek_type() == 'COMMA':
+                self._consume_token('COMMA')
+        return nomes
+
+    def _parse_classe(self, is_abstract: bool) -> PlantUMLClasse:
+        """Parseia 'class Nome [extends Pai] [implements I1, I2]', a partir da palavra-chave."""
+        self._consume_token('CLASS')
+        nome_token = self._consume_any()
+        if nome_token.type not in _NAME_TYPES: self._parse_error(f"Esperado nome para CLASS, encontrou {nome_token.type}")
+
+        pai = None
+        interfaces = []
+        if self._peek_type() == 'EXTENDS':
+            self._consume_token('EXTENDS')
+            pai_token = self._consume_any()
+            if pai_token.type not in _NAME_TYPES: self._parse_error("Nome inválido para classe pai.")
+            pai = pai_token.value
+        if self._peek_type() == 'IMPLEMENTS':
+            self._consume_token('IMPLEMENTS')
+            interfaces = self._parse_lista_nomes()
+        return PlantUMLClasse(nome=nome_token.value, is_abstract=is_abstract, classe_pai=pai, interfaces_implementadas=interfaces)
+
+    def _parse_interface(self, is_abstract: bool) -> PlantUMLInterface:
+        """Parseia 'interface Nome [extends I1, I2]', a partir da palavra-chave."""
+        self._consume_token('INTERFACE')
+        nome_token = self._consume_any()
+        if nome_token.type not in _NAME_TYPES: self._parse_error("Nome inválido para interface.")
+
+        interfaces_pai = []
+        if self._peek_type() == 'EXTENDS':
+            self._consume_token('EXTENDS')
+            interfaces_pai = self._parse_lista_nomes()
+        return PlantUMLInterface(nome=nome_token.value, interfaces_pai=interfaces_pai)
+
+    def _parse_enum(self, is_abstract: bool) -> PlantUMLEnum:
+        """Parseia 'enum Nome', a partir da palavra-chave."""
+        self._consume_token('ENUM')
+        nome_token = self._consume_any()
+        if nome_token.type not in _NAME_TYPES: self._parse_error("Nome inválido para enum.")
+        return PlantUMLEnum(nome=nome_token.value)
 
     def _parse_declaracao_pacote(self):
         """Parseia uma declaração de pacote."""
         self._consume_token('PACKAGE')
-        nome_token = self._consume_token()
-        if nome_token.type not in ['ID', 'QUOTED_STRING']: self._parse_error(f"Nome inválido para pacote.")
+        nome_token = self._consume_any()
+        if nome_token.type not in _NAME_TYPES: self._parse_error("Nome inválido para pacote.")
         nome_pacote = nome_token.value
         
         novo_pacote = PlantUMLPacote(nome=nome_pacote)
         self._adicionar_elemento_ao_contexto_ou_diagrama(novo_pacote)
         
-        if self._peek_token() and self._peek_token().type == 'LBRACE':
+        proximo = self._peek0()
+        if proximo and proximo.type == 'LBRACE':
             self._consume_token('LBRACE')
             self.contexto_atual_pilha.append(novo_pacote)
         # '}' será tratado pelo loop principal do parse
 
     def _parse_relacionamento(self):
         """Parseia uma linha de relacionamento."""
-        # print(f"DEBUG: Iniciando _parse_relacionamento. Próximo token: {self._peek_token()}")
+        # print(f"DEBUG: Iniciando _parse_relacionamento. Próximo token: {self._peek0()}")
         
-        origem_token = self._consume_token() 
-        if origem_token.type not in ['ID', 'QUOTED_STRING']: 
+        origem_token = self._consume_any() 
+        if origem_token.type not in _NAME_TYPES: 
             self._parse_error(f"Nome de origem inválido para relacionamento, esperava ID ou QUOTED_STRING, pegou {origem_token.type}")
         origem = origem_token.value
         # print(f"DEBUG: Origem consumida: {origem_token}")
         card_origem = None
         
-        if self._peek_token() and self._peek_token().type == 'QUOTED_STRING':
+        proximo = self._peek0()
+        if proximo and proximo.type == 'QUOTED_STRING':
             # Verificar se o próximo token é uma seta para não confundir label de associação de classe
             # Esta é uma heurística. Se a string entre aspas for seguida por uma seta, é cardinalidade.
-            if self._peek_token(1) and self._peek_token(1).type.startswith('ARROW_'):
+            seguinte = self._peek_token(1)
+            if seguinte and seguinte.type in ARROW_TYPES:
                 card_origem_token = self._consume_token('QUOTED_STRING')
                 card_origem = card_origem_token.value
                 # print(f"DEBUG: Card_origem consumido: {card_origem_token}")
             
-        seta_token = self._peek_token()
-        if not seta_token or not seta_token.type.startswith('ARROW_'):
+        seta_token = self._peek0()
+        if not seta_token or seta_token.type not in ARROW_TYPES:
             self._parse_error(f"Esperada seta de relacionamento, encontrou {seta_token.type if seta_token else 'EOF'}")
-        self._consume_token(seta_token.type) 
+        seta_tipo, seta_valor = seta_token.type, seta_token.value
+        self._consume_token(seta_tipo) 
         # print(f"DEBUG: Seta consumida: {seta_token}")
         
         card_destino = None
-        if self._peek_token() and self._peek_token().type == 'QUOTED_STRING':
+        proximo = self._peek0()
+        if proximo and proximo.type == 'QUOTED_STRING':
             card_destino_token = self._consume_token('QUOTED_STRING')
             card_destino = card_destino_token.value
             # print(f"DEBUG: Card_destino consumido: {card_destino_token}")
+            proximo = self._peek0()
             
-        if not self._peek_token(): self._parse_error("Esperado nome de destino para relacionamento, encontrou EOF.")
-        destino_token = self._consume_token()
+        if not proximo: self._parse_error("Esperado nome de destino para relacionamento, encontrou EOF.")
+        destino_token = self._consume_any()
         # print(f"DEBUG: Tentativa de destino consumida: {destino_token}") 
-        if destino_token.type not in ['ID', 'QUOTED_STRING']: 
+        if destino_token.type not in _NAME_TYPES: 
             self._parse_error(f"Nome de destino inválido para relacionamento, esperava ID ou QUOTED_STRING, pegou {destino_token.type}")
         destino = destino_token.value
         
         label = None
         classe_associacao = None
-        if self._peek_token() and self._peek_token().type == 'COLON':
+        proximo = self._peek0()
+        if proximo and proximo.type == 'COLON':
             self._consume_token('COLON')
             # print("DEBUG: COLON para label consumido.")
-            if self._peek_token() and self._peek_token().type in ['ID', 'QUOTED_STRING']: # Label pode ser ID ou String
-                label_token = self._consume_token()
+            proximo = self._peek0()
+            if proximo and proximo.type in _NAME_TYPES: # Label pode ser ID ou String
+                label_token = self._consume_any()
                 label = label_token.value
                 # print(f"DEBUG: Label consumido: {label_token}")
                 
                 # Após consumir o label, verificar se há outro COLON para classe de associação
-                if self._peek_token() and self._peek_token().type == 'COLON':
+                proximo = self._peek0()
+                if proximo and proximo.type == 'COLON':
                     self._consume_token('COLON')  # Consome o segundo ':'
                     # Agora verificar se há classe de associação: (NomeClasse)
-                    if self._peek_token() and self._peek_token().type == 'LPAREN':
+                    proximo = self._peek0()
+                    if proximo and proximo.type == 'LPAREN':
                         self._consume_token('LPAREN')
-                        if self._peek_token() and self._peek_token().type in ['ID', 'QUOTED_STRING']:
-                            classe_associacao_token = self._consume_token()
+                        proximo = self._peek0()
+                        if proximo and proximo.type in _NAME_TYPES:
+                            classe_associacao_token = self._consume_any()
                             classe_associacao = classe_associacao_token.value
-                            if self._peek_token() and self._peek_token().type == 'RPAREN':
+                            proximo = self._peek0()
+                            if proximo and proximo.type == 'RPAREN':
                                 self._consume_token('RPAREN')
                             else:
                                 self._parse_error("Esperado ')' após nome da classe de associação")
@@ -414,12 +537,14 @@ class PlantUMLParser:
                             self._parse_error("Esperado nome da classe de associação após '('")
                             
             # Verificar se há uma classe de associação diretamente após primeiro : (sem label)
-            elif self._peek_token() and self._peek_token().type == 'LPAREN':
+            elif proximo and proximo.type == 'LPAREN':
                 self._consume_token('LPAREN')
-                if self._peek_token() and self._peek_token().type in ['ID', 'QUOTED_STRING']:
-                    classe_associacao_token = self._consume_token()
+                proximo = self._peek0()
+                if proximo and proximo.type in _NAME_TYPES:
+                    classe_associacao_token = self._consume_any()
                     classe_associacao = classe_associacao_token.value
-                    if self._peek_token() and self._peek_token().type == 'RPAREN':
+                    proximo = self._peek0()
+                    if proximo and proximo.type == 'RPAREN':
                         self._consume_token('RPAREN')
                     else:
                         self._parse_error("Esperado ')' após nome da classe de associação")
@@ -428,43 +553,45 @@ class PlantUMLParser:
             # PlantUML permite label vazio após ':', nosso lexer não gera token.
             # Se não for ID ou QUOTED_STRING, assumimos que não há label após ':' ou o lexer não pegou.
 
-        tipo_rel = self._traduzir_seta_para_tipo_relacionamento(seta_token.type, seta_token.value)
+        tipo_rel = self._traduzir_seta_para_tipo_relacionamento(seta_tipo, seta_valor)
         
         # Ajustar origem/destino para herança/implementação com base na direção da seta PlantUML
-        if tipo_rel == "heranca" and seta_token.type == 'ARROW_INHERITANCE_RIGHT':
+        if tipo_rel == "heranca" and seta_tipo == 'ARROW_INHERITANCE_RIGHT':
              origem, destino = destino, origem
         elif tipo_rel == "implementacao":
             # Para implementação, a lógica é: A <|.. B significa B implementa A
             # Então A (interface) deve ser origem, B (implementador) deve ser destino
-            if seta_token.type == 'ARROW_IMPLEMENTATION_RIGHT_STRONG' or \
-               (seta_token.type == 'ARROW_DIRECTED_DEPENDENCY_RIGHT' and ".." in seta_token.value and "|" in seta_token.value): # ..|>
+            if seta_tipo == 'ARROW_IMPLEMENTATION_RIGHT_STRONG' or \
+               (seta_tipo == 'ARROW_DIRECTED_DEPENDENCY_RIGHT' and ".." in seta_valor and "|" in seta_valor): # ..|>
                 # Para setas da direita (..|>), não trocar - já está correto
                 pass
             else:
                 # Para setas da esquerda (<|..), trocar para que a interface seja origem
                 origem, destino = destino, origem
 
-        novo_relacionamento = PlantUMLRelacionamento(
+        novo_relacionamento = self._criar_relacionamento(
             origem=origem, destino=destino, tipo=tipo_rel, label=label,
             cardinalidade_origem=card_origem, cardinalidade_destino=card_destino
         )
-        self.diagrama.adicionar_relacionamento(novo_relacionamento)
+        # append direto na lista: adicionar_relacionamento é só um invólucro de list.append
+        adicionar_relacionamento = self.diagrama.relacionamentos.append
+        adicionar_relacionamento(novo_relacionamento)
         
         # Se há uma classe de associação, criar relacionamentos adicionais
         if classe_associacao:
             # Criar relacionamento da classe de associação para a origem
-            rel_associacao_origem = PlantUMLRelacionamento(
+            rel_associacao_origem = self._criar_relacionamento(
                 origem=classe_associacao, destino=origem, tipo="associacao",
                 label=None, cardinalidade_origem="1", cardinalidade_destino=card_origem or "1"
             )
-            self.diagrama.adicionar_relacionamento(rel_associacao_origem)
+            adicionar_relacionamento(rel_associacao_origem)
             
             # Criar relacionamento da classe de associação para o destino
-            rel_associacao_destino = PlantUMLRelacionamento(
+            rel_associacao_destino = self._criar_relacionamento(
                 origem=classe_associacao, destino=destino, tipo="associacao", 
                 label=None, cardinalidade_origem="1", cardinalidade_destino=card_destino or "1"
             )
-            self.diagrama.adicionar_relacionamento(rel_associacao_destino)
+            adicionar_relacionamento(rel_associacao_destino)
         
         # print(f"DEBUG: Relacionamento ADICIONADO: {novo_relacionamento}")
 
@@ -473,108 +600,337 @@ class PlantUMLParser:
         self._consume_token('NOTE') # Consome 'note'
         
         # Consome a posição da nota (left, right, top, bottom, etc.) se presente
-        if self._peek_token() and self._peek_token().type == 'ID':
+        proximo = self._peek0()
+        if proximo and proximo.type == 'ID':
             self._consume_token('ID') # posição
             
         # Consome 'of' se presente
-        if self._peek_token() and self._peek_token().type == 'ID' and self._peek_token().value.lower() == 'of':
+        proximo = self._peek0()
+        if proximo and proximo.type == 'ID' and proximo.value.lower() == 'of':
             self._consume_token('ID') # 'of'
             
         # Consome o nome da classe relacionada se presente
-        if self._peek_token() and self._peek_token().type in ['ID', 'QUOTED_STRING']:
-            self._consume_token() # nome da classe
+        proximo = self._peek0()
+        if proximo and proximo.type in _NAME_TYPES:
+            self._consume_any() # nome da classe
             
         # Ignora todo o conteúdo até encontrar 'end note'
-        while self._peek_token():
-            if (self._peek_token().type == 'END' and 
-                self._peek_token(1) and self._peek_token(1).type == 'NOTE'):
+        while proximo := self._peek0():
+            seguinte = self._peek_token(1)
+            if (proximo.type == 'END' and 
+                seguinte and seguinte.type == 'NOTE'):
                 self._consume_token('END')
                 self._consume_token('NOTE')
                 break
             else:
-                self._consume_token() # Ignora qualquer token
+                self._consume_any() # Ignora qualquer token
+
+    def _contexto_de_membros(self) -> Any:
+        """Retorna a estrutura (classe, interface ou enum) com corpo aberto no topo da pilha, se houver."""
+        pilha = self.contexto_atual_pilha
+        if pilha and isinstance(pilha[-1], (PlantUMLClasse, PlantUMLInterface, PlantUMLEnum)):
+            return pilha[-1]
+        return None
+
+    def _tratar_membro(self, token: Token, contexto_ativo: Any):
+        """Parseia uma linha dentro do corpo aberto de uma classe, interface ou enum."""
+        # Se a linha de declaração da estrutura não abriu com LBRACE,
+        # mas estamos no contexto dela, esta linha DEVE ser um membro ou RBRACE.
+        # A chamada a _parse_membros_estrutura é feita quando LBRACE é encontrado.
+        # Aqui, lidamos com membros de linha única ou caso o RBRACE seja o próximo.
+        # Lê exatamente um membro e volta ao laço principal
+        if token.type == 'ID' and isinstance(contexto_ativo, PlantUMLEnum): # Para valores de Enum
+            self._parse_valor_enum(contexto_ativo)
+        elif token.type in _MEMBER_START_TYPES:
+            self._parse_atributo_ou_metodo(contexto_ativo) # Para classes/interfaces
+        else:
+            self._parse_error(f"Token inesperado '{token.value}' ({token.type}) dentro da estrutura '{contexto_ativo.nome}'")
+
+    # --- Tratadores do laço principal, escolhidos pelo tipo do token (_DESPACHO_TOPO) ---
+
+    def _tratar_diretiva(self, token: Token):
+        """Consome @enduml ou uma diretiva hide/skinparam, que já trazem tudo no próprio token."""
+        self._consume_any()
+
+    def _tratar_diretiva_com_argumento(self, token: Token):
+        """Consome @startuml ou uma diretiva '!', com o nome ou argumento opcional."""
+        self._consume_any()
+        if self._peek_type() in _NAME_TYPES:
+            self._consume_any()
+
+    def _tratar_fecha_chave(self, token: Token):
+        """Fecha o contexto (estrutura ou pacote) aberto mais recente."""
+        if self.contexto_atual_pilha:
+            self.contexto_atual_pilha.pop()
+        self._consume_any()
+
+    def _tratar_pacote(self, token: Token):
+        """Pacotes são declarados mesmo dentro do corpo de uma estrutura."""
+        self._parse_declaracao_pacote()
+
+    def _tratar_estrutura(self, token: Token):
+        """Declaração de classe, interface ou enum (ou um membro, se houver corpo aberto)."""
+        contexto_ativo = self._contexto_de_membros()
+        if contexto_ativo:
+            self._tratar_membro(token, contexto_ativo)
+        else:
+            self._tratar_estrutura_sem_contexto(token)
+
+    def _tratar_nota(self, token: Token):
+        """Bloco de nota (ou um membro, se houver corpo aberto)."""
+        contexto_ativo = self._contexto_de_membros()
+        if contexto_ativo:
+            self._tratar_membro(token, contexto_ativo)
+        else:
+            self._tratar_nota_sem_contexto(token)
+
+    def _parece_relacionamento(self) -> bool:
+        """Indica se o nome no token atual é seguido de uma seta, direto ou após uma cardinalidade."""
+        tipos = self.token_types
+        idx = self.token_idx + 1
+        n = self._tokens_len
+        if idx >= n:
+            return False
+        seguinte = tipos[idx]
+        if seguinte in ARROW_TYPES:
+            return True
+        return seguinte == 'QUOTED_STRING' and idx + 1 < n and tipos[idx + 1] in ARROW_TYPES
+
+    def _tratar_nome(self, token: Token):
+        """ID ou QUOTED_STRING: início de relacionamento, membro ou erro."""
+        # ID/QS ["card"] ARROW ... é relacionamento, mesmo dentro do corpo de uma estrutura
+        if self._parece_relacionamento():
+            self._parse_relacionamento()
+            return
+        contexto_ativo = self._contexto_de_membros()
+        if contexto_ativo:
+            self._tratar_membro(token, contexto_ativo)
+        else:
+            self._tratar_nome_sem_contexto(token)
+
+    def _tratar_outro(self, token: Token):
+        """Qualquer outro token só é válido como início de membro de uma estrutura."""
+        contexto_ativo = self._contexto_de_membros()
+        if contexto_ativo:
+            self._tratar_membro(token, contexto_ativo)
+        else:
+            self._tratar_outro_sem_contexto(token)
+
+    # --- Tratadores para a pilha de contexto vazia (_DESPACHO_SEM_CONTEXTO): sem corpo
+    # aberto, não há membros a considerar e a pilha nem precisa ser consultada ---
+
+    def _tratar_estrutura_sem_contexto(self, token: Token):
+        """Declaração de classe, interface ou enum."""
+        self._parse_declaracao_estrutura()
+
+    def _tratar_nota_sem_contexto(self, token: Token):
+        """Bloco de nota."""
+        self._parse_nota()
+
+    def _tratar_nome_sem_contexto(self, token: Token):
+        """ID ou QUOTED_STRING fora de uma estrutura só pode iniciar um relacionamento."""
+        if self._parece_relacionamento():
+            self._parse_relacionamento()
+        else:
+            self._parse_error(f"Token ID/QUOTED_STRING inesperado ('{token.value}') no escopo principal ou de pacote.")
+
+    def _tratar_outro_sem_contexto(self, token: Token):
+        """Nenhum outro token pode iniciar uma linha fora de uma estrutura."""
+        self._parse_error(f"Token desconhecido/inesperado no início da linha: {token.type} ('{token.value}')")
 
     def parse(self, plantuml_code: Optional[str] = None) -> PlantUMLDiagrama:
         """
-        Executa o processo completo de análise do código PlantUML.
+        Executa o processo completo de análise do código PlantUML. Os erros
+        léxicos são escritos no stdout mesmo quando o parsing falha com SyntaxError.
+        """
+        try:
+            diagrama, erros = self._parse(plantuml_code)
+        except SyntaxError:
+            if plantuml_code is not None:
+                _reportar_erros(_tokenizar(plantuml_code)[2])
+            raise
+        _reportar_erros(erros)
+        return diagrama
+
+    def _parse(self, plantuml_code: Optional[str] = None) -> Tuple[PlantUMLDiagrama, Tuple[LexError, ...]]:
+        """
+        Faz a análise sem imprimir nada: devolve o diagrama e os erros léxicos,
+        que ficam a cargo de quem chama (parse() e parse_cached()).
         """
-        if plantuml_code:
-            lexer.lineno = 1
-            lexer.input(plantuml_code)
-            self.tokens = []
-            while True:
-                tok = lexer.token()
-                if not tok: break
-                self.tokens.append(tok)
+        # Código vazio ("") também é tokenizado: um parser reaproveitado não pode
+        # parsear de novo os tokens do código anterior
+        if plantuml_code is not None:
+            self.tokens, self.token_types, erros = _tokenizar(plantuml_code)
+        else:
+            # Tokens atribuídos diretamente: congelados numa tupla, e os tipos derivados deles
+            self.tokens = tuple(self.tokens)
+            self.token_types = tuple([token.type for token in self.tokens])
+            erros = ()
         
         self.token_idx = 0
+        self._tokens_len = len(self.tokens)
         self.diagrama = PlantUMLDiagrama()
         self.contexto_atual_pilha = []
-
-        while self.token_idx < len(self.tokens):
-            token = self._peek_token()
-            if not token: break
-
-            if token.type in ['AT_STARTUML', 'AT_ENDUML', 'SKINPARAM_DIRECTIVE']:
-                self._consume_token()
-                if token.type == 'AT_STARTUML' and self._peek_token() and self._peek_token().type in ['ID', 'QUOTED_STRING']:
-                     self._consume_token() 
-                elif token.type == 'SKINPARAM_DIRECTIVE' and token.value.startswith("!"): 
-                     if self._peek_token() and self._peek_token().type in ['ID', 'QUOTED_STRING']:
-                        self._consume_token() 
-                continue
-            
-            if token.type == 'RBRACE': 
-                if self.contexto_atual_pilha:
-                    self.contexto_atual_pilha.pop()
-                self._consume_token()
-                continue
-            
-            contexto_ativo = self._obter_contexto_atual()
-            
-            # Se estamos dentro de um contexto que espera membros (classe, interface, enum com corpo aberto)
-            if contexto_ativo and token.type != 'PACKAGE' and \
-               not (token.type in ['ID', 'QUOTED_STRING'] and self._peek_token(1) and self._peek_token(1).type.startswith('ARROW_')) and \
-               not (token.type in ['ID', 'QUOTED_STRING'] and self._peek_token(1) and self._peek_token(1).type == 'QUOTED_STRING' and self._peek_token(2) and self._peek_token(2).type.startswith('ARROW_')) : # Se não for início de relacionamento
-                if isinstance(contexto_ativo, (PlantUMLClasse, PlantUMLInterface, PlantUMLEnum)):
-                    # Se a linha de declaração da estrutura não abriu com LBRACE,
-                    # mas estamos no contexto dela, esta linha DEVE ser um membro ou RBRACE.
-                    # A chamada a _parse_membros_estrutura é feita quando LBRACE é encontrado.
-                    # Aqui, lidamos com membros de linha única ou caso o RBRACE seja o próximo.
-                    if token.type in ['VISIBILITY', 'STATIC_MODIFIER', 'ABSTRACT_MODIFIER', 'ID', 'QUOTED_STRING']:
-                        self._parse_atributo_ou_metodo(contexto_ativo) # Para classes/interfaces
-                        if isinstance(contexto_ativo, PlantUMLEnum) and token.type == 'ID': # Para valores de Enum
-                            self._parse_membros_estrutura(contexto_ativo) # Chama para pegar valor de enum
-                    else:
-                        self._parse_error(f"Token inesperado '{token.value}' ({token.type}) dentro da estrutura '{contexto_ativo.nome}'")
-                    continue # Após processar membro ou erro, pular para próximo token
-
-            # Se não estamos em um contexto de membro, ou o token não indica um membro,
-            # então deve ser uma declaração de estrutura, pacote, ou relacionamento.
-            if token.type == 'PACKAGE':
-                self._parse_declaracao_pacote()
-            elif token.type in ['ABSTRACT', 'CLASS', 'INTERFACE', 'ENUM']:
-                self._parse_declaracao_estrutura()
-            elif token.type == 'NOTE':
-                self._parse_nota()
-            elif token.type in ['ID', 'QUOTED_STRING']: # Potencial início de relacionamento
-                # Heurística mais forte para relacionamento
-                is_relationship_candidate = False
-                # ID/QS ["card"] ARROW ...
-                if self._peek_token(1) and self._peek_token(1).type.startswith('ARROW_'): is_relationship_candidate = True
-                elif self._peek_token(1) and self._peek_token(1).type == 'QUOTED_STRING' and \
-                     self._peek_token(2) and self._peek_token(2).type.startswith('ARROW_'):
-                    is_relationship_candidate = True
-                
-                if is_relationship_candidate:
-                    self._parse_relacionamento()
-                else:
-                    self._parse_error(f"Token ID/QUOTED_STRING inesperado ('{token.value}') no escopo principal ou de pacote.")
+        self._relacionamentos_criados = {}
+
+        tokens = self.tokens
+        tipos = self.token_types
+        pilha = self.contexto_atual_pilha
+        despacho = _DESPACHO_TOPO
+        despacho_sem_contexto = _DESPACHO_SEM_CONTEXTO
+        tratar_outro = PlantUMLParser._tratar_outro
+        tratar_outro_sem_contexto = PlantUMLParser._tratar_outro_sem_contexto
+        while self.token_idx < self._tokens_len:
+            idx = self.token_idx
+            # Com a pilha vazia (o caso comum) vai direto ao tratador de topo
+            if pilha:
+                despacho.get(tipos[idx], tratar_outro)(self, tokens[idx])
             else:
-                self._parse_error(f"Token desconhecido/inesperado no início da linha: {token.type} ('{token.value}')")
-                
-        return self.diagrama
-
+                despacho_sem_contexto.get(tipos[idx], tratar_outro_sem_contexto)(self, tokens[idx])
+
+        return self.diagrama, erros
+
+
+
+# Tratador do laço principal pelo tipo do primeiro token da linha
+_DESPACHO_TOPO = {
+    'AT_STARTUML': PlantUMLParser._tratar_diretiva_com_argumento,
+    'BANG_DIRECTIVE': PlantUMLParser._tratar_diretiva_com_argumento,
+    'AT_ENDUML': PlantUMLParser._tratar_diretiva,
+    'SKINPARAM_DIRECTIVE': PlantUMLParser._tratar_diretiva,
+    'RBRACE': PlantUMLParser._tratar_fecha_chave,
+    'PACKAGE': PlantUMLParser._tratar_pacote,
+    'ABSTRACT': PlantUMLParser._tratar_estrutura,
+    'CLASS': PlantUMLParser._tratar_estrutura,
+    'INTERFACE': PlantUMLParser._tratar_estrutura,
+    'ENUM': PlantUMLParser._tratar_estrutura,
+    'NOTE': PlantUMLParser._tratar_nota,
+    'ID': PlantUMLParser._tratar_nome,
+    'QUOTED_STRING': PlantUMLParser._tratar_nome,
+}
+
+# Mesmo despacho quando a pilha de contexto está vazia
+_DESPACHO_SEM_CONTEXTO = {
+    **_DESPACHO_TOPO,
+    'ABSTRACT': PlantUMLParser._tratar_estrutura_sem_contexto,
+    'CLASS': PlantUMLParser._tratar_estrutura_sem_contexto,
+    'INTERFACE': PlantUMLParser._tratar_estrutura_sem_contexto,
+    'ENUM': PlantUMLParser._tratar_estrutura_sem_contexto,
+    'NOTE': PlantUMLParser._tratar_nota_sem_contexto,
+    'ID': PlantUMLParser._tratar_nome_sem_contexto,
+    'QUOTED_STRING': PlantUMLParser._tratar_nome_sem_contexto,
+}
+
+# Tipo do token da palavra-chave -> método que parseia a declaração da estrutura
+_DESPACHO_ESTRUTURA = {
+    'CLASS': PlantUMLParser._parse_classe,
+    'INTERFACE': PlantUMLParser._parse_interface,
+    'ENUM': PlantUMLParser._parse_enum,
+}
+
+# Cache em disco dos diagramas já parseados, compartilhado entre processos (CLI,
+# --serve e os workers de --input com vários arquivos). Guarda no máximo
+# _CACHE_MAX_ARQUIVOS diagramas, descartando os usados há mais tempo; a pasta
+# pode ser apagada a qualquer momento, e None desliga o cache em disco.
+_CACHE_DIR: Optional[Path] = Path.home() / ".cache" / "plantuml2py"
+_CACHE_MAX_ARQUIVOS = 256
+
+@lru_cache(maxsize=1)
+def _versao_do_parser() -> bytes:
+    """
+    SHA-256 do código-fonte do pacote plantuml_parser (lexer, parser e estruturas
+    de dados), calculado no primeiro uso do cache em disco. Qualquer alteração
+    nele muda a chave do cache, sem versão manual.
+    """
+    package_dir = Path(__file__).resolve().parent
+    digest = hashlib.sha256()
+    for source in sorted(package_dir.rglob('*.py')):
+        digest.update(source.relative_to(package_dir).as_posix().encode('utf-8'))
+        digest.update(source.read_bytes())
+    return digest.digest()
+
+def _arquivo_em_disco(plantuml_code: str) -> Path:
+    """Arquivo do cache em disco para o código, pelo SHA-256 do código junto com o do parser."""
+    chave = hashlib.sha256(_versao_do_parser() + plantuml_code.encode('utf-8')).hexdigest()
+    return _CACHE_DIR / f"{chave}.pkl"
+
+def _ler_do_disco(cache_file: Path) -> Optional[Tuple[bytes, Tuple[LexError, ...]]]:
+    """Lê o diagrama serializado e os erros léxicos gravados; None se não houver."""
+    try:
+        dados, erros = pickle.loads(cache_file.read_bytes())
+    except Exception:
+        return None
+    # Marca o uso: o descarte começa pelos arquivos usados há mais tempo
+    try:
+        os.utime(cache_file)
+    except OSError:
+        pass
+    return dados, erros
+
+def _gravar_no_disco(cache_file: Path, entrada: Tuple[bytes, Tuple[LexError, ...]]):
+    """Grava a entrada no cache em disco. Falhas no cache nunca impedem a conversão."""
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        # Grava num arquivo temporário e o renomeia: processos que gravam o mesmo
+        # diagrama ao mesmo tempo nunca deixam um arquivo pela metade, e quem lê
+        # vê o antigo ou o novo inteiro
+        fd, tmp_name = tempfile.mkstemp(dir=cache_file.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(pickle.dumps(entrada, pickle.HIGHEST_PROTOCOL))
+            os.replace(tmp_name, cache_file)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+        arquivos = list(cache_file.parent.glob("*.pkl"))
+        if len(arquivos) > _CACHE_MAX_ARQUIVOS:
+            arquivos.sort(key=lambda arq: arq.stat().st_mtime)
+            for antigo in arquivos[:len(arquivos) - _CACHE_MAX_ARQUIVOS]:
+                antigo.unlink()
+    except OSError:
+        pass
+
+@lru_cache(maxsize=64)
+def _diagrama_serializado(plantuml_code: str) -> Tuple[bytes, Tuple[LexError, ...]]:
+    """
+    Devolve o diagrama do código já serializado, com os erros léxicos: da memória,
+    do cache em disco ou, se não estiver em nenhum dos dois, de um novo parse.
+    """
+    cache_file = _arquivo_em_disco(plantuml_code) if _CACHE_DIR is not None else None
+    entrada = _ler_do_disco(cache_file) if cache_file is not None else None
+    if entrada is None:
+        # Os erros léxicos são reportados por parse_cached, em toda chamada
+        diagrama, erros = PlantUMLParser()._parse(plantuml_code)
+        entrada = pickle.dumps(diagrama, pickle.HIGHEST_PROTOCOL), erros
+        if cache_file is not None:
+            _gravar_no_disco(cache_file, entrada)
+    return entrada
+
+def parse_cached(plantuml_code: str, errors: Optional[List[LexError]] = None) -> PlantUMLDiagrama:
+    """
+    Como PlantUMLParser().parse(), mas memoriza o resultado por código, em memória
+    e no cache em disco (_CACHE_DIR): reenviar o mesmo diagrama, neste ou em outro
+    processo, não refaz a análise léxica nem o parsing. Cada chamada
+    devolve uma cópia nova (desserializada), então quem a recebe pode alterá-la
+    à vontade; desserializar custa cerca de metade de um novo parse, enquanto
+    copy.deepcopy sairia mais caro que parsear de novo. Erros de sintaxe não são
+    memorizados, e os erros léxicos são reportados em toda chamada, como no parse(),
+    inclusive antes de um erro de sintaxe, que muitas vezes é consequência deles.
+    Com uma lista em `errors`, os erros léxicos são acrescentados a ela em vez de
+    escritos no stdout (ex.: o --serve, cujo stdout é o canal das respostas).
+    """
+    try:
+        dados, erros = _diagrama_serializado(plantuml_code)
+    except SyntaxError:
+        _reportar_erros(_tokenizar(plantuml_code)[2], errors)
+        raise
+    _reportar_erros(erros, errors)
+    return pickle.loads(dados)
+
+def clear_parse_cache():
+    """Esvazia os caches de tokens e de diagramas em memória (usado nos testes)."""
+    _diagrama_serializado.cache_clear()
+    _tokenizar.cache_clear()
 
 if __name__ == '__main__':
     with open("diagramas/exemplo_diagrama.plantuml", "r", encoding="utf-8") as f:
@@ -1,7 +1,7 @@
 """
 Módulo ImportManager para o gerador de código Python.
 """
-from typing import Set, List, Optional, Union, TYPE_CHECKING, Any as TypingAny
+from typing import Set, List, Optional, Tuple, Union, TYPE_CHECKING, Any as TypingAny
 from .utils import to_pascal_case, sanitize_name_for_python_module
 import os 
 import re 
@@ -13,6 +13,28 @@ from back_end.plantuml_parser.data_structures import PlantUMLClasse, PlantUMLEnu
 if TYPE_CHECKING:
     from .type_mapper import TypeMapper
 
+# Cada nome de tipo dentro de um tipo PlantUML, mesmo genérico e aninhado:
+# "Map<String, List<Pedido>>" -> "Map", "String", "List", "Pedido"
+_TYPE_NAME_RE = re.compile(r"[^<>,\s](?:[^<>,]*[^<>,\s])?")
+# Sem nenhum destes caracteres, o tipo é um único nome
+_COMPOUND_TYPE_CHARS = frozenset("<>,")
+
+# Hints de tipos simples: atributos desses tipos sem valor default não precisam de Optional
+_PY_PRIMITIVES = frozenset({"str", "int", "float", "bool", "Any", "None", "datetime.date"})
+
+# Cardinalidades que indicam vários objetos no destino de um relacionamento
+_MULTIPLE_CARDINALITIES = frozenset({"0..*", "1..*", "n"})
+
+def _is_multiple(rel) -> bool:
+    """Indica se a cardinalidade de destino do relacionamento admite vários objetos."""
+    cardinalidade = rel.cardinalidade_destino
+    return bool(cardinalidade) and ("*" in cardinalidade or cardinalidade.strip() in _MULTIPLE_CARDINALITIES)
+
+def _split_module_path(module_dot_path: str) -> Tuple[Tuple[str, ...], str]:
+    """Separa 'pacote.sub.modulo' em (('pacote', 'sub'), 'modulo')."""
+    package, dot, module_name = module_dot_path.rpartition('.')
+    return (tuple(package.split('.')) if dot else ()), module_name
+
 class ImportManager:
     """Gerencia a coleta e formatação de instruções de import para os arquivos Python."""
     def __init__(self, 
@@ -20,71 +42,66 @@ class ImportManager:
                  structure_module_paths: dict[str, str]):
         self.all_defined_structure_names: Set[str] = all_defined_structure_names
         self.structure_module_paths: dict[str, str] = structure_module_paths
+        # Caminhos de módulo já divididos em (pacote, módulo), calculados uma vez por estrutura
+        self._split_module_paths: dict[str, Tuple[Tuple[str, ...], str]] = {
+            name: _split_module_path(dot_path) for name, dot_path in structure_module_paths.items()
+        }
+        # Nome da classe Python (PascalCase) de cada estrutura definida
+        self._pascal_case_names: dict[str, str] = {
+            name: to_pascal_case(name) for name in all_defined_structure_names
+        }
+        # Imports relativos já calculados, por (estrutura alvo, pacote atual): o import
+        # só depende do pacote, então todos os arquivos de um mesmo pacote o compartilham
+        self._relative_import_cache: dict[tuple[str, Tuple[str, ...]], str] = {}
 
     def _calculate_relative_import_path(self, 
                                         target_original_plantuml_name: str, 
-                                        current_file_module_dot_path: str
+                                        current_file_module_dot_path: str,
+                                        current_package_path: Optional[Tuple[str, ...]] = None
                                         ) -> Optional[str]:
-        """Calcula a string de import relativo para uma estrutura alvo."""
-        target_pascal_case_name = to_pascal_case(target_original_plantuml_name)
+        """
+        Calcula a string de import relativo para uma estrutura alvo (memorizada por par alvo/pacote atual).
+        Quem chama várias vezes para o mesmo módulo pode passar o pacote atual já dividido em partes.
+        """
         target_module_full_dot_path = self.structure_module_paths.get(target_original_plantuml_name)
 
         if not target_module_full_dot_path or target_module_full_dot_path == current_file_module_dot_path:
             return None 
 
-        current_path_list = current_file_module_dot_path.split('.')
-        target_path_list = target_module_full_dot_path.split('.')
-        
-        current_package_path_list = current_path_list[:-1]
-        target_package_path_list = target_path_list[:-1]
-        target_module_name_itself = target_path_list[-1]
-
-        if current_package_path_list == target_package_path_list:
-            return f"from .{target_module_name_itself} import {target_pascal_case_name}"
-
-        common_ancestor_len = 0
-        while (common_ancestor_len < len(current_package_path_list) and
-               common_ancestor_len < len(target_package_path_list) and
-               current_package_path_list[common_ancestor_len] == target_package_path_list[common_ancestor_len]):
-            common_ancestor_len += 1
-
-        levels_up = len(current_package_path_list) - common_ancestor_len
-        path_down_from_ancestor = target_package_path_list[common_ancestor_len:]
-        
-        import_prefix = "." * levels_up if levels_up > 0 else ""
-        
-        # Se não subiu e não estão no mesmo pacote, significa que o atual é ancestral do alvo, ou são irmãos na raiz
-        if not import_prefix:
-             import_prefix = "."
-        
-        from_path_parts = [import_prefix] if import_prefix != "." else ["."]
-        if import_prefix.startswith("."):
-            from_path_parts = [import_prefix]
-        else:
-            from_path_parts = []
-
-
-        from_path_parts.extend(path_down_from_ancestor)
-        from_path_parts.append(target_module_name_itself)
-        
-        final_from_path = ".".join(s for s in from_path_parts if s)
-        if import_prefix == "." and not path_down_from_ancestor and final_from_path == target_module_name_itself:
-            final_from_path = f".{target_module_name_itself}"
-        elif not final_from_path.startswith(".") and final_from_path:
-             final_from_path = "." + final_from_path
-
-
-        if not final_from_path or final_from_path == ".":
-            return f"from .{target_module_name_itself} import {target_pascal_case_name}"
-
-        return f"from {final_from_path} import {target_pascal_case_name}"
+        if current_package_path is None:
+            current_package_path = _split_module_path(current_file_module_dot_path)[0]
+        key = (target_original_plantuml_name, current_package_path)
+        try:
+            return self._relative_import_cache[key]
+        except KeyError:
+            pass
+        rel_imp = self._relative_import_cache[key] = self._compute_relative_import_path(
+            target_original_plantuml_name, current_package_path
+        )
+        return rel_imp
+
+    def _compute_relative_import_path(self, 
+                                      target_original_plantuml_name: str, 
+                                      current_package_path: Tuple[str, ...]
+                                      ) -> str:
+        """Calcula a string de import relativo para uma estrutura alvo, a partir do pacote atual já dividido."""
+        target_pascal_case_name = (self._pascal_case_names.get(target_original_plantuml_name)
+                                   or to_pascal_case(target_original_plantuml_name))
+
+        target_package_path, target_module_name_itself = self._split_module_paths[target_original_plantuml_name]
+
+        # Um ponto é o próprio pacote atual; cada ponto a mais sobe um nível até o ancestral comum
+        common_ancestor_len = len(os.path.commonprefix([current_package_path, target_package_path]))
+        dots = "." * (len(current_package_path) - common_ancestor_len + 1)
+        from_path = ".".join(target_package_path[common_ancestor_len:] + (target_module_name_itself,))
+        return f"from {dots}{from_path} import {target_pascal_case_name}"
 
     def collect_imports_for_structure(self, 
                                       structure: Union[PlantUMLClasse, PlantUMLEnum, PlantUMLInterface], 
                                       type_mapper: "TypeMapper",
                                       current_file_module_dot_path: str,
-                                      inheritance_from_relationships: List[str] = None,
-                                      relationships_for_structure: List = None
+                                      inheritance_from_relationships: Optional[List[str]] = None,
+                                      relationships_for_structure: Optional[List] = None
                                       ) -> List[str]:
         """Coleta e formata todas as instruções de import necessárias."""
         standard_imports: Set[str] = set()
@@ -102,32 +119,30 @@ class ImportManager:
             standard_imports.add("from abc import ABC, abstractmethod")
 
         # Coleta todos os nomes de tipos PlantUML usados
-        all_types_to_resolve_plantuml: Set[Optional[str]] = set()
+        all_types_to_resolve_plantuml: Set[str] = set()
         
-        # Coleta nomes de tipos usados como herança
-        parent_type_names_plantuml: List[str] = []
+        # Coleta nomes de tipos usados como herança (um set: só é usado para testes de pertinência)
+        parent_type_names_plantuml: Set[str] = set()
         if isinstance(structure, data_structures.PlantUMLClasse):
-            if structure.classe_pai: parent_type_names_plantuml.append(structure.classe_pai)
-            parent_type_names_plantuml.extend(structure.interfaces_implementadas or [])
+            if structure.classe_pai: parent_type_names_plantuml.add(structure.classe_pai)
+            parent_type_names_plantuml.update(structure.interfaces_implementadas or [])
         elif isinstance(structure, data_structures.PlantUMLInterface):
-            parent_type_names_plantuml.extend(structure.interfaces_pai or [])
+            parent_type_names_plantuml.update(structure.interfaces_pai or [])
         
         # Adicionar herança dos relacionamentos
         if inheritance_from_relationships:
-            parent_type_names_plantuml.extend(inheritance_from_relationships)
+            parent_type_names_plantuml.update(inheritance_from_relationships)
             
         all_types_to_resolve_plantuml.update(parent_type_names_plantuml)
 
         # Adicionar tipos dos relacionamentos
         if relationships_for_structure:
-            for rel in relationships_for_structure:
-                all_types_to_resolve_plantuml.add(rel.destino)
-                # Adicionar Optional para relacionamentos (parâmetros do __init__)
-                typing_imports_needed.add("Optional")
-                # Adicionar List para relacionamentos múltiplos
-                is_multiple = rel.cardinalidade_destino and ("*" in rel.cardinalidade_destino or rel.cardinalidade_destino.strip() in ["0..*", "1..*", "n"])
-                if is_multiple:
-                    typing_imports_needed.add("List")
+            all_types_to_resolve_plantuml.update(rel.destino for rel in relationships_for_structure)
+            # Adicionar Optional para relacionamentos (parâmetros do __init__)
+            typing_imports_needed.add("Optional")
+            # Adicionar List para relacionamentos múltiplos
+            if any(_is_multiple(rel) for rel in relationships_for_structure):
+                typing_imports_needed.add("List")
 
         if isinstance(structure, (data_structures.PlantUMLClasse, data_structures.PlantUMLInterface)):
             for attr in structure.atributos:
@@ -137,39 +152,48 @@ class ImportManager:
                 for param in met.parametros:
                     all_types_to_resolve_plantuml.add(param.tipo)
         
+        # Hints já mapeados neste arquivo: os tipos dos atributos são consultados de novo abaixo
+        hint_cache: dict[Optional[str], tuple] = {}
+        def _hint(puml_type: Optional[str]) -> tuple:
+            result = hint_cache.get(puml_type)
+            if result is None:
+                result = hint_cache[puml_type] = type_mapper.get_python_type_hint_and_imports(
+                    puml_type, current_file_module_dot_path, False
+                )
+            return result
+
+        # Pacote do arquivo atual, dividido uma vez para todos os imports relativos
+        current_package_path = _split_module_path(current_file_module_dot_path)[0]
+
+        # Tipos ausentes (None ou "") só contribuem com os imports do hint padrão,
+        # mapeado uma única vez; o laço abaixo recebe apenas nomes de tipo
+        missing_types = {None, ""} & all_types_to_resolve_plantuml
+        if missing_types:
+            all_types_to_resolve_plantuml -= missing_types
+            _hint_str, s_imps, t_imps = _hint(None)
+            standard_imports.update(s_imps)
+            typing_imports_needed.update(t_imps)
+
+        # Sem estruturas definidas no diagrama, nenhum tipo pode gerar import relativo
+        defined_names = self.all_defined_structure_names
+
         # Processar cada tipo PlantUML para obter hints Python e imports
         for puml_type_name in all_types_to_resolve_plantuml:
-            _hint_str, s_imps, t_imps = type_mapper.get_python_type_hint_and_imports(
-                puml_type_name, current_file_module_dot_path, False 
-            )
+            _hint_str, s_imps, t_imps = _hint(puml_type_name)
             standard_imports.update(s_imps)
             typing_imports_needed.update(t_imps)
             
-            if puml_type_name:
-                # Lógica para import relativo
-                types_to_check_for_relative_import_stack = [puml_type_name]
-                processed_for_relative_import : Set[str] = set()
-
-                while types_to_check_for_relative_import_stack:
-                    current_puml_type_for_rel = types_to_check_for_relative_import_stack.pop()
-                    if not current_puml_type_for_rel or current_puml_type_for_rel in processed_for_relative_import:
-                        continue
-                    processed_for_relative_import.add(current_puml_type_for_rel)
-
-                    base_type_for_rel_import = current_puml_type_for_rel
-                    generic_match_base = re.match(r"(\w+)\s*<([^>]+)>", current_puml_type_for_rel)
-                    
-                    if generic_match_base:
-                        base_type_for_rel_import = generic_match_base.group(1)
-                        inner_content = generic_match_base.group(2)
-                        inner_types = [t.strip() for t in inner_content.split(',')]
-                        for t_inside in inner_types:
-                            if t_inside not in processed_for_relative_import:
-                                types_to_check_for_relative_import_stack.append(t_inside)
-                        continue 
-                    
-                    if base_type_for_rel_import and base_type_for_rel_import in self.all_defined_structure_names:
-                        rel_imp = self._calculate_relative_import_path(base_type_for_rel_import, current_file_module_dot_path)
+            if defined_names:
+                # Lógica para import relativo: só tipos compostos passam pela varredura
+                # que encontra todos os nomes de tipo, inclusive os de genéricos aninhados
+                if _COMPOUND_TYPE_CHARS.isdisjoint(puml_type_name):
+                    type_names = (puml_type_name.strip(),)
+                else:
+                    type_names = _TYPE_NAME_RE.findall(puml_type_name)
+                for base_type_for_rel_import in type_names:
+                    if base_type_for_rel_import in defined_names:
+                        rel_imp = self._calculate_relative_import_path(base_type_for_rel_import, current_file_module_dot_path,
+                                                                   current_package_path)
                         if rel_imp:
                             if base_type_for_rel_import in parent_type_names_plantuml:
                                 relative_imports_for_heritage.add(rel_imp)
@@ -180,43 +204,31 @@ class ImportManager:
         if isinstance(structure, data_structures.PlantUMLClasse):
             for attr in structure.atributos:
                 if not attr.is_static:
-                    py_type_hint, _s, t_imps_attr = type_mapper.get_python_type_hint_and_imports(attr.tipo, current_file_module_dot_path)
+                    py_type_hint, _s, t_imps_attr = _hint(attr.tipo)
                     typing_imports_needed.update(t_imps_attr) 
                     if attr.default_value is not None or \
-                       (py_type_hint not in ["str", "int", "float", "bool", "Any", "None", "datetime.date"] and not py_type_hint.startswith("'")):
+                       (py_type_hint not in _PY_PRIMITIVES and not py_type_hint.startswith("'")):
                         typing_imports_needed.add("Optional")
                 else:
                     # CORREÇÃO 5: Adicionar ClassVar para atributos estáticos
                     typing_imports_needed.add("ClassVar")
                         
-        # Formatar Bloco de Imports
-        import_lines: List[str] = []
-        
-        if standard_imports:
-            import_lines.extend(sorted(list(standard_imports)))
-
-        if relative_imports_for_heritage:
-            import_lines.extend(sorted(list(relative_imports_for_heritage)))
-
-        if typing_imports_needed:
-            valid_typing_imports = {t for t in typing_imports_needed if t and t != "None"}
-            if relative_imports:
-                valid_typing_imports.add("TYPE_CHECKING")
-            if valid_typing_imports:
-                if import_lines and not (import_lines[-1].startswith("from typing import") or import_lines[-1].strip() == ""):
-                    import_lines.append("")
-                import_lines.append(f"from typing import {', '.join(sorted(list(valid_typing_imports)))}")
-        elif relative_imports:
-            import_lines.append("from typing import TYPE_CHECKING")
+        # Formatar Bloco de Imports: cada seção é montada como texto e uma linha
+        # em branco separa as seções; o resultado volta a ser uma lista de linhas
+        # Imports da biblioteca padrão e das classes base formam uma única seção
+        module_block = "\n".join([*sorted(standard_imports), *sorted(relative_imports_for_heritage)])
 
+        valid_typing_imports = {t for t in typing_imports_needed if t and t != "None"}
         if relative_imports:
-            if import_lines and import_lines[-1].strip() != "":
-                import_lines.append("")
-            import_lines.append("if TYPE_CHECKING:")
-            for rel_imp in sorted(list(relative_imports)):
-                import_lines.append(f"    {rel_imp}")
-
-        if import_lines and (not import_lines[-1] or import_lines[-1].strip() != ""):
-            import_lines.append("")
-
-        return import_lines
\ No newline at end of file
+            valid_typing_imports.add("TYPE_CHECKING")
+        typing_line = f"from typing import {', '.join(sorted(valid_typing_imports))}" if valid_typing_imports else ""
+        if not typing_imports_needed:
+            # Só com TYPE_CHECKING, a linha do typing continua a seção anterior
+            module_block = "\n".join(filter(None, (module_block, typing_line)))
+            typing_line = ""
+
+        type_checking_block = "\n".join(["if TYPE_CHECKING:", *(f"    {rel_imp}" for rel_imp in sorted(relative_imports))]) \
+            if relative_imports else ""
+
+        import_block = "\n\n".join(filter(None, (module_block, typing_line, type_checking_block)))
+        return f"{import_block}\n".split("\n") if import_block else []
\ No newline at end of file
@@ -2,8 +2,8 @@
 Módulo MainCodeGenerator - Orquestrador Principal do Gerador.
 """
 from typing import List, Set, Optional, Union, Any, Tuple, Dict, Callable, TYPE_CHECKING
+from functools import lru_cache
 import os
-import re
 
 from back_end.plantuml_parser.data_structures import (
     PlantUMLDiagrama, PlantUMLClasse, PlantUMLEnum, PlantUMLInterface, PlantUMLPacote
@@ -13,48 +13,86 @@ from .type_mapper import TypeMapper
 from .import_manager import ImportManager
 from .structure_generators import ClassGenerator, EnumGenerator, InterfaceGenerator
 
+# Os mesmos nomes de estruturas e pacotes são convertidos várias vezes por diagrama
+# (caminhos de módulo, arquivos, __init__.py); as conversões ficam memorizadas
+_sanitize_name = lru_cache(maxsize=1024)(sanitize_name_for_python_module)
+_pascal_case = lru_cache(maxsize=1024)(to_pascal_case)
+
+# Estruturas que geram um arquivo .py cada; a tupla é montada uma vez, não a cada item visitado
+_STRUCTURE_TYPES = (PlantUMLClasse, PlantUMLEnum, PlantUMLInterface)
 
 class MainCodeGenerator:
     """Orquestra a geração de arquivos Python a partir de um diagrama PlantUML."""
     def __init__(self, parsed_diagram: PlantUMLDiagrama, output_base_dir: str, diagram_name: str = None):
         # Cria subpasta numerada
         base_dir = output_base_dir
-        if not os.path.exists(base_dir):
-            os.makedirs(base_dir)
+        os.makedirs(base_dir, exist_ok=True)
         # Usa o nome do diagrama se fornecido, senão padrão "Diagrama"
         if diagram_name:
-            base_name = sanitize_name_for_python_module(diagram_name)
+            base_name = _sanitize_name(diagram_name)
         else:
             base_name = "Diagrama"
         # Garante unicidade: se já existe, incrementa _2, _3, ...
+        # Os nomes já usados (pastas ou arquivos) vêm de uma única listagem do diretório
+        # e são pulados sem tocar no disco
+        with os.scandir(base_dir) as entradas:
+            existentes = {entrada.name for entrada in entradas}
         nome_final = base_name
         i = 1
-        while os.path.exists(os.path.join(base_dir, nome_final)):
+        # os.mkdir (sem exist_ok) reserva a pasta escolhida: se ela já existe (ex.: sistemas
+        # que ignoram maiúsculas) ou se outro processo a criou ao mesmo tempo, tenta o próximo sufixo
+        while True:
+            if nome_final not in existentes:
+                try:
+                    os.mkdir(os.path.join(base_dir, nome_final))
+                    break
+                except FileExistsError:
+                    pass
             i += 1
             nome_final = f"{base_name}_{i}"
         self.output_base_dir = os.path.join(base_dir, nome_final)
-        os.makedirs(self.output_base_dir, exist_ok=True)
+        # Diretórios já criados nesta geração: cada pasta de pacote é criada uma única vez
+        self._created_dirs: Set[str] = {self.output_base_dir}
         
         self.parsed_diagram: PlantUMLDiagrama = parsed_diagram
         self.generated_files_manifest: List[str] = []
         
-        self._all_defined_structure_names: Set[str] = self._collect_all_structure_names()
-        self._structure_module_paths: dict[str, str] = self._map_structure_module_paths()
+        # Nomes, caminhos de módulo e conteúdo de cada pacote, coletados em uma única travessia
+        (self._all_defined_structure_names,
+         self._structure_module_paths,
+         self._package_content_map) = self._index_structures()
 
         self.type_mapper: TypeMapper = TypeMapper(self._all_defined_structure_names, self._structure_module_paths)
         self.import_manager: ImportManager = ImportManager(self._all_defined_structure_names, self._structure_module_paths)
 
+    def _ensure_dir(self, dir_path: str):
+        """Cria o diretório (e os pais) se ainda não foi criado nesta geração."""
+        if dir_path not in self._created_dirs:
+            os.makedirs(dir_path, exist_ok=True)
+            self._created_dirs.add(dir_path)
 
-    def _collect_all_structure_names(self) -> Set[str]:
-        """Coleta recursivamente todos os nomes de estruturas definidas no diagrama."""
+    def _index_structures(self) -> Tuple[Set[str], dict[str, str], Dict[str, Dict[str, List[str]]]]:
+        """
+        Percorre o diagrama uma única vez e coleta, para cada estrutura definida, seu nome
+        original e seu caminho de módulo Python, além do conteúdo de cada pacote
+        (estruturas e sub-pacotes) usado para gerar os __init__.py.
+        """
         names: Set[str] = set()
-        def _collect_recursive(elements: List[Any]):
+        paths: dict[str, str] = {}
+        package_content_map: Dict[str, Dict[str, List[str]]] = {"root": {"structures": [], "sub_packages": []}}
+        def _walk(elements: List[Any], current_path_parts: List[str]):
+            current_package_key = ".".join(current_path_parts) if current_path_parts else "root"
+            package_content = package_content_map.setdefault(current_package_key, {"structures": [], "sub_packages": []})
             for item in elements:
-                if isinstance(item, (PlantUMLClasse, PlantUMLEnum, PlantUMLInterface)):
-                    names.add(item.nome) 
+                if isinstance(item, _STRUCTURE_TYPES):
+                    names.add(item.nome)
+                    paths[item.nome] = ".".join(current_path_parts + [_sanitize_name(item.nome)])
+                    package_content["structures"].append(item.nome)
                 elif isinstance(item, PlantUMLPacote):
-                    _collect_recursive(item.elementos)
-        _collect_recursive(self.parsed_diagram.elementos)
+                    sanitized_pkg_name = _sanitize_name(item.nome)
+                    package_content["sub_packages"].append(sanitized_pkg_name)
+                    _walk(item.elementos, current_path_parts + [sanitized_pkg_name])
+        _walk(self.parsed_diagram.elementos, [])
         
         # Adiciona classes mencionadas nos relacionamentos que podem não estar explicitamente definidas
         # Primeiro checa se há relacionamentos para evitar erro
@@ -63,7 +101,7 @@ class MainCodeGenerator:
                 names.add(rel.origem)
                 names.add(rel.destino)
         
-        return names
+        return names, paths, package_content_map
     
     def _add_missing_classes_from_relationships(self):
         """Adiciona classes que estão nos relacionamentos mas não foram definidas explicitamente."""
@@ -103,7 +141,7 @@ class MainCodeGenerator:
                             tipo_retorno="bool",
                             is_abstract=True
                         )
-                        item.metodos.append(abstract_method)
+                        item.adicionar_metodo(abstract_method)
                 elif isinstance(item, PlantUMLPacote):
                     _mark_recursive(item.elementos)
         
@@ -117,20 +155,6 @@ class MainCodeGenerator:
             classes.add(rel.destino)
         return classes
 
-    def _map_structure_module_paths(self) -> dict[str, str]:
-        """Mapeia o nome original de cada estrutura para seu caminho de módulo Python."""
-        paths: dict[str, str] = {}
-        def _map_recursive(elements: List[Any], current_path_parts: List[str]):
-            for item in elements:
-                sanitized_item_module_name = sanitize_name_for_python_module(item.nome)
-                if isinstance(item, (PlantUMLClasse, PlantUMLEnum, PlantUMLInterface)):
-                    module_dot_path = ".".join(current_path_parts + [sanitized_item_module_name])
-                    paths[item.nome] = module_dot_path
-                elif isinstance(item, PlantUMLPacote):
-                    _map_recursive(item.elementos, current_path_parts + [sanitized_item_module_name])
-        _map_recursive(self.parsed_diagram.elementos, [])
-        return paths
-
     def _get_relationships_for_class(self, class_name: str) -> list:
         """Retorna relacionamentos que devem virar atributos na classe (baseado na direção da seta PlantUML)."""
         all_rels = []
@@ -197,12 +221,12 @@ class MainCodeGenerator:
             
             # Adiciona um id básico
             id_attr = PlantUMLAtributo(nome="id", tipo="int", visibilidade="+")
-            structure.atributos.append(id_attr)
+            structure.adicionar_atributo(id_attr)
             
             # Se for uma classe como Usuario, adiciona nome
             if structure.nome.lower() in ["usuario", "user", "pessoa", "person"]:
                 nome_attr = PlantUMLAtributo(nome="nome", tipo="str", visibilidade="+")
-                structure.atributos.append(nome_attr)
+                structure.adicionar_atributo(nome_attr)
         
         return structure
     
@@ -223,8 +247,8 @@ class MainCodeGenerator:
         """Gera um arquivo .py para uma única estrutura."""
         file_content_lines: List[str] = []
         
-        python_class_name = to_pascal_case(structure.nome)
-        current_file_module_name_sanitized = sanitize_name_for_python_module(structure.nome)
+        python_class_name = _pascal_case(structure.nome)
+        current_file_module_name_sanitized = _sanitize_name(structure.nome)
         current_file_module_dot_path = ".".join(package_dot_path_parts + [current_file_module_name_sanitized])
 
         # 1. Coletar e Adicionar Imports
@@ -237,36 +261,37 @@ class MainCodeGenerator:
         file_content_lines.extend(import_lines)
 
         # 2. Gerar Declaração da Estrutura
-        parent_classes_py_hints_for_class_def: List[str] = []
-        parent_type_names_plantuml: List[str] = []
-
-        # Adicionar herança definida na estrutura original
+        # Um único despacho pelo tipo da estrutura define a herança declarada nela,
+        # a base implícita (ABC/Enum) e o sub-gerador do corpo
+        implicit_base: Optional[str] = None
         if isinstance(structure, PlantUMLClasse):
-            if structure.classe_pai: parent_type_names_plantuml.append(structure.classe_pai)
+            parent_type_names_plantuml: List[str] = [structure.classe_pai] if structure.classe_pai else []
             parent_type_names_plantuml.extend(structure.interfaces_implementadas or [])
+            if structure.is_abstract or any(m.is_abstract for m in structure.metodos):
+                implicit_base = "ABC"
+            body_generator_cls = ClassGenerator
         elif isinstance(structure, PlantUMLInterface):
-            parent_type_names_plantuml.extend(structure.interfaces_pai or [])
-        
-        # Adicionar herança dos relacionamentos
-        inheritance_map = self._get_inheritance_relationships()
-        if structure.nome in inheritance_map:
-            parent_type_names_plantuml.extend(inheritance_map[structure.nome])
-        
-        for p_type_name in parent_type_names_plantuml:
-            if p_type_name:
-                hint, _s_imp, _t_imp = self.type_mapper.get_python_type_hint_and_imports(
+            parent_type_names_plantuml = list(structure.interfaces_pai or [])
+            implicit_base = "ABC"
+            body_generator_cls = InterfaceGenerator
+        else:
+            # Enum: a única base é Enum, qualquer outra herança é ignorada
+            parent_type_names_plantuml = []
+            body_generator_cls = EnumGenerator
+
+        if body_generator_cls is EnumGenerator:
+            parent_classes_py_hints_for_class_def: List[str] = ["Enum"]
+        else:
+            # Adicionar herança dos relacionamentos
+            parent_type_names_plantuml.extend(inheritance_from_rels)
+            parent_classes_py_hints_for_class_def = [
+                self.type_mapper.get_python_type_hint_and_imports(
                     p_type_name, current_file_module_dot_path, for_heritage_list=True
-                )
-                parent_classes_py_hints_for_class_def.append(hint)
-        
-        # Adicionar ABC e Enum à lista de herança se aplicável
-        has_abstract_methods = any(m.is_abstract for m in structure.metodos)
-        if isinstance(structure, PlantUMLClasse) and (structure.is_abstract or has_abstract_methods):
-            if "ABC" not in parent_classes_py_hints_for_class_def: parent_classes_py_hints_for_class_def.append("ABC")
-        elif isinstance(structure, PlantUMLInterface):
-            if "ABC" not in parent_classes_py_hints_for_class_def: parent_classes_py_hints_for_class_def.append("ABC")
-        elif isinstance(structure, PlantUMLEnum):
-            parent_classes_py_hints_for_class_def = ["Enum"]
+                )[0]
+                for p_type_name in parent_type_names_plantuml if p_type_name
+            ]
+            if implicit_base and implicit_base not in parent_classes_py_hints_for_class_def:
+                parent_classes_py_hints_for_class_def.append(implicit_base)
 
         parent_str = f"({', '.join(parent_classes_py_hints_for_class_def)})" if parent_classes_py_hints_for_class_def else ""
         file_content_lines.append(f"class {python_class_name}{parent_str}:")
@@ -276,36 +301,31 @@ class MainCodeGenerator:
         file_content_lines.append("") 
 
         # 4. Gerar Corpo da Estrutura usando sub-geradores
-        body_lines: List[str] = []
-        if isinstance(structure, PlantUMLEnum):
-            enum_gen = EnumGenerator(structure, self.type_mapper, current_file_module_dot_path)
-            body_lines.extend(enum_gen.generate_code_lines())
-        elif isinstance(structure, PlantUMLInterface):
-            interface_gen = InterfaceGenerator(structure, self.type_mapper, current_file_module_dot_path)
-            body_lines.extend(interface_gen.generate_code_lines())
-        elif isinstance(structure, PlantUMLClasse):
+        if body_generator_cls is ClassGenerator:
             # Enriquece classes pai com atributos básicos se necessário
-            parent_classes = self._get_parent_classes()
-            if structure.nome in parent_classes:
+            if structure.nome in self._get_parent_classes():
                 structure = self._enrich_parent_class_with_basic_attributes(structure)
-            
-            rels = self._get_relationships_for_class(structure.nome)
-            # Obtém informações sobre herança dos relacionamentos
-            inheritance_map = self._get_inheritance_relationships()
-            parent_classes_from_rels = inheritance_map.get(structure.nome, [])
-            class_gen = ClassGenerator(structure, self.type_mapper, current_file_module_dot_path, rels, parent_classes_from_rels)
-            body_lines.extend(class_gen.generate_code_lines())
+            # Relacionamentos e herança dos relacionamentos já obtidos para os imports
+            body_gen = ClassGenerator(structure, self.type_mapper, current_file_module_dot_path,
+                                      relationships_for_structure, inheritance_from_rels)
+        else:
+            body_gen = body_generator_cls(structure, self.type_mapper, current_file_module_dot_path)
+        body_lines: List[str] = body_gen.generate_code_lines()
         file_content_lines.extend(body_lines)
         file_content_lines.append("")
 
         # 5. Salvar o Arquivo
-        file_name = f"{sanitize_name_for_python_module(structure.nome)}.py"
+        file_name = f"{_sanitize_name(structure.nome)}.py"
         file_path = os.path.join(current_disk_path, file_name)
         
-        os.makedirs(current_disk_path, exist_ok=True)
+        self._ensure_dir(current_disk_path)
         
         final_content = "\n".join(file_content_lines)
-        final_content = re.sub(r'\n\s*\n\s*$', '\n\n', final_content) 
+        # Espaços em branco no fim do arquivo viram no máximo uma linha em branco:
+        # o trecho final é localizado direto pelo rstrip, sem varrer o texto com regex
+        content_end = len(final_content.rstrip())
+        if final_content.count("\n", content_end) >= 2:
+            final_content = final_content[:final_content.index("\n", content_end)] + "\n\n"
 
         with open(file_path, 'w', encoding='utf-8') as f:
             f.write(final_content)
@@ -317,28 +337,26 @@ class MainCodeGenerator:
         init_file_path = os.path.join(package_disk_path, "__init__.py")
         init_content: List[str] = ["# Pacote gerado automaticamente"]
         
-        structure_exports = []
+        structure_exports: List[str] = []
         if structure_names_in_package:
             init_content.append("\n# Importando estruturas deste pacote")
-            for original_name in sorted(structure_names_in_package):
-                python_module_name = sanitize_name_for_python_module(original_name)
-                python_class_name = to_pascal_case(original_name)
-                init_content.append(f"from .{python_module_name} import {python_class_name}")
-                structure_exports.append(python_class_name)
+            sorted_names = sorted(structure_names_in_package)
+            structure_exports = [_pascal_case(original_name) for original_name in sorted_names]
+            init_content.extend(
+                f"from .{_sanitize_name(original_name)} import {python_class_name}"
+                for original_name, python_class_name in zip(sorted_names, structure_exports)
+            )
         
-        sub_package_exports = []
+        sub_package_exports: List[str] = []
         if sub_package_names:
             init_content.append("\n# Importando sub-pacotes")
-            for sanitized_pkg_name in sorted(sub_package_names):
-                init_content.append(f"from . import {sanitized_pkg_name}")
-                sub_package_exports.append(sanitized_pkg_name)
+            sub_package_exports = sorted(sub_package_names)
+            init_content.extend(f"from . import {sanitized_pkg_name}" for sanitized_pkg_name in sub_package_exports)
 
         all_exports = sorted(structure_exports + sub_package_exports)
         if all_exports:
-            init_content.append("\n__all__ = [")
-            for export_name in all_exports:
-                init_content.append(f"    \"{export_name}\",")
-            init_content.append("]")
+            # Todo o bloco do __all__ é montado de uma vez
+            init_content.append("\n__all__ = [\n" + "".join(f'    "{export_name}",\n' for export_name in all_exports) + "]")
 
         with open(init_file_path, 'w', encoding='utf-8') as f:
             f.write("\n".join(init_content) + "\n")
@@ -346,25 +364,16 @@ class MainCodeGenerator:
 
     def generate_files(self) -> List[str]:
         """Gera todos os arquivos Python com base no diagrama."""
-        os.makedirs(self.output_base_dir, exist_ok=True)
+        # Uma nova geração confere de novo as pastas no disco (podem ter sido apagadas)
+        self._created_dirs.clear()
+        self._ensure_dir(self.output_base_dir)
         self.generated_files_manifest = []
-        package_content_map: Dict[str, Dict[str, List[str]]] = {"root": {"structures": [], "sub_packages": []}}
-
-        def _organize_for_inits(elements: List[Any], current_package_key_parts: List[str]):
-            current_package_key = ".".join(current_package_key_parts) if current_package_key_parts else "root"
-            if current_package_key not in package_content_map:
-                package_content_map[current_package_key] = {"structures": [], "sub_packages": []}
-
-            for item in elements:
-                if isinstance(item, (PlantUMLClasse, PlantUMLEnum, PlantUMLInterface)):
-                    package_content_map[current_package_key]["structures"].append(item.nome)
-                elif isinstance(item, PlantUMLPacote):
-                    sanitized_pkg_name = sanitize_name_for_python_module(item.nome)
-                    package_content_map[current_package_key]["sub_packages"].append(sanitized_pkg_name)
-                    _organize_for_inits(item.elementos, current_package_key_parts + [sanitized_pkg_name])
-        
-        # Organizar primeiro as estruturas explícitas
-        _organize_for_inits(self.parsed_diagram.elementos, [])
+        # Parte das estruturas explícitas já organizadas por pacote no construtor (uma cópia,
+        # para que gerar os arquivos de novo não acumule as classes dos relacionamentos)
+        package_content_map: Dict[str, Dict[str, List[str]]] = {
+            key: {"structures": list(content["structures"]), "sub_packages": list(content["sub_packages"])}
+            for key, content in self._package_content_map.items()
+        }
         
         # Garantir que todas as classes dos relacionamentos estejam no root
         if hasattr(self.parsed_diagram, 'relacionamentos') and self.parsed_diagram.relacionamentos:
@@ -382,7 +391,7 @@ class MainCodeGenerator:
         self._mark_classes_as_interfaces(interface_classes)
 
         def _generate_recursive(elements: List[Any], current_disk_path: str, current_package_dot_path_parts: List[str]):
-            os.makedirs(current_disk_path, exist_ok=True)
+            self._ensure_dir(current_disk_path)
             current_package_key = ".".join(current_package_dot_path_parts) if current_package_dot_path_parts else "root"
             
             structure_names_for_init = package_content_map.get(current_package_key, {}).get("structures", [])
@@ -391,10 +400,10 @@ class MainCodeGenerator:
             self._create_package_init(current_disk_path, structure_names_for_init, sub_package_names_for_init)
 
             for item in elements:
-                if isinstance(item, (PlantUMLClasse, PlantUMLEnum, PlantUMLInterface)):
+                if isinstance(item, _STRUCTURE_TYPES):
                     self._generate_file_for_structure(item, current_disk_path, current_package_dot_path_parts)
                 elif isinstance(item, PlantUMLPacote):
-                    sanitized_sub_pkg_name = sanitize_name_for_python_module(item.nome)
+                    sanitized_sub_pkg_name = _sanitize_name(item.nome)
                     new_disk_path = os.path.join(current_disk_path, sanitized_sub_pkg_name)
                     _generate_recursive(item.elementos, new_disk_path, current_package_dot_path_parts + [sanitized_sub_pkg_name])
         
@@ -416,8 +425,7 @@ def gerar_codigo_python(plantuml_code: str, output_base_dir: str, diagram_name:
     """
     Função utilitária para gerar código Python a partir de um diagrama PlantUML (string).
     """
-    from back_end.plantuml_parser.parser import PlantUMLParser
-    parser = PlantUMLParser()
-    diagrama = parser.parse(plantuml_code)
+    from back_end.plantuml_parser.parser import parse_cached
+    diagrama = parse_cached(plantuml_code)
     generator = MainCodeGenerator(diagrama, output_base_dir, diagram_name)
     return generator.generate_files()
\ No newline at end of file
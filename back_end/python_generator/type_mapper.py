@@ -15,11 +15,28 @@ class TypeMapper:
             "Boolean": "bool", "boolean": "bool", "Date": "datetime.date", "void": "None"
         }
         self.typing_module_primitives: Set[str] = {"List", "Optional", "Dict", "Set", "Tuple", "Union", "Any", "Callable"}
+        # Conversões já feitas, por (tipo PlantUML, lista de herança): o mesmo tipo aparece
+        # em vários atributos, parâmetros e arquivos, e o resultado não depende do arquivo atual
+        self._hint_cache: dict[tuple[Optional[str], bool], Tuple[str, frozenset, frozenset]] = {}
 
-    def get_python_type_hint_and_imports(self, plantuml_type: str, current_file_module_dot_path: str, for_heritage_list: bool = False):
+    def get_python_type_hint_and_imports(self, plantuml_type: Optional[str], current_file_module_dot_path: str, for_heritage_list: bool = False):
         """
         Converte um tipo PlantUML para type hint Python e retorna os imports necessários.
+        O resultado é memorizado; os conjuntos de imports devolvidos são imutáveis (frozenset).
         """
+        key = (plantuml_type, for_heritage_list)
+        try:
+            return self._hint_cache[key]
+        except KeyError:
+            pass
+        hint, standard_imports, typing_imports = self._map_type_hint_and_imports(
+            plantuml_type, current_file_module_dot_path, for_heritage_list
+        )
+        result = self._hint_cache[key] = (hint, frozenset(standard_imports), frozenset(typing_imports))
+        return result
+
+    def _map_type_hint_and_imports(self, plantuml_type: Optional[str], current_file_module_dot_path: str, for_heritage_list: bool):
+        """Faz a conversão de um tipo PlantUML, sem memorização."""
         standard_imports: Set[str] = set()
         typing_imports: Set[str] = set() 
 
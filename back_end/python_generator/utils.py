@@ -7,6 +7,18 @@ as convenções Python para módulos, classes e variáveis.
 import re
 import unicodedata
 
+# Tabela de tradução da cedilha, aplicada em uma única passada sobre o nome
+_CEDILHA = str.maketrans({'ç': 'c', 'Ç': 'C'})
+
+# Expressões regulares compiladas uma vez, usadas a cada nome convertido
+_CAMEL_WORD_RE = re.compile(r'(.)([A-Z][a-z]+)')
+_CAMEL_LOWER_UPPER_RE = re.compile(r'([a-z0-9])([A-Z])')
+_WHITESPACE_RE = re.compile(r'\s+')
+_INVALID_IDENTIFIER_CHARS_RE = re.compile(r'[^0-9a-zA-Z_]')
+_UNDERSCORES_RE = re.compile(r'_+')
+_PASCAL_SEPARATORS_RE = re.compile(r'[_\s]+')
+_CAMEL_PARTS_RE = re.compile(r'[A-Z]?[a-z0-9]+|[A-Z]+(?![a-z])')
+
 def remove_accents_and_specials(name: str) -> str:
     """
     Remove acentos e substitui 'ç' por 'c' em uma string.
@@ -17,7 +29,7 @@ def remove_accents_and_specials(name: str) -> str:
     Returns:
         Nome sem acentos e cedilha.
     """
-    name = name.replace('ç', 'c').replace('Ç', 'C')
+    name = name.translate(_CEDILHA)
     nfkd = unicodedata.normalize('NFKD', name)
     return "".join([c for c in nfkd if not unicodedata.combining(c)])
 
@@ -35,11 +47,11 @@ def sanitize_name_for_python_module(name: str) -> str:
     name = remove_accents_and_specials(name)
     name = name.replace('"', '') # Remove aspas que podem vir de nomes PlantUML
     # Converte CamelCase/PascalCase para snake_case e lida com espaços
-    s1 = re.sub(r'(.)([A-Z][a-z]+)', r'\1_\2', name)
-    name = re.sub(r'([a-z0-9])([A-Z])', r'\1_\2', s1).lower()
-    name = re.sub(r'\s+', '_', name) # Substitui espaços restantes por underscores
-    name = re.sub(r'[^0-9a-zA-Z_]', '', name) # Remove caracteres não alfanuméricos exceto underscore
-    name = re.sub(r'_+', '_', name)  # Remove duplo underline
+    s1 = _CAMEL_WORD_RE.sub(r'\1_\2', name)
+    name = _CAMEL_LOWER_UPPER_RE.sub(r'\1_\2', s1).lower()
+    name = _WHITESPACE_RE.sub('_', name) # Substitui espaços restantes por underscores
+    name = _INVALID_IDENTIFIER_CHARS_RE.sub('', name) # Remove caracteres não alfanuméricos exceto underscore
+    name = _UNDERSCORES_RE.sub('_', name)  # Remove duplo underline
     name = name.strip('_') # Remove underscores no início/fim
     if not name:
         return "_unnamed_module_or_variable"
@@ -61,9 +73,9 @@ def to_pascal_case(name: str) -> str:
     name = remove_accents_and_specials(name)
     name = name.strip().replace('"', '')
     # Divide por underline, espaço ou transição minúscula/maiúscula para melhor PascalCase
-    parts = re.split(r'[_\s]+', name)
+    parts = _PASCAL_SEPARATORS_RE.split(name)
     if len(parts) == 1 and name: # Se não dividiu por _ ou espaço, tenta por CamelCase
-        parts = re.findall(r'[A-Z]?[a-z0-9]+|[A-Z]+(?![a-z])', name)
+        parts = _CAMEL_PARTS_RE.findall(name)
     
     capitalized_parts = [p.capitalize() for p in parts if p]
     pascal_case_name = "".join(capitalized_parts)
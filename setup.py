@@ -0,0 +1,22 @@
+# Build opcional: compila o lexer, o parser, as estruturas de dados e o gerador Python com Cython.
+# Uso: python setup.py build_ext --inplace
+# Sem os .so gerados, os módulos .py puros continuam sendo importados normalmente.
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name="plantuml_to_code_converter",
+    ext_modules=cythonize(
+        [
+            "back_end/plantuml_parser/lexer.py",
+            "back_end/plantuml_parser/parser.py",
+            "back_end/plantuml_parser/data_structures/*.py",
+            "back_end/python_generator/main_generator.py",
+            "back_end/python_generator/import_manager.py",
+            "back_end/python_generator/type_mapper.py",
+            "back_end/python_generator/utils.py",
+        ],
+        language_level=3,
+        exclude=["back_end/plantuml_parser/data_structures/__init__.py"],
+    ),
+)
\ No newline at end of file
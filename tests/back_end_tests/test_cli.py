@@ -0,0 +1,83 @@
+"""
+Este arquivo testa a função convert() do CLI, usada para converter um diagrama
+no mesmo processo, sem chamar o main_cli via subprocess.
+"""
+import io
+import json
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+from back_end import main_cli
+from back_end.plantuml_parser import parser as parser_module
+from back_end.plantuml_parser.parser import PlantUMLParser, clear_parse_cache
+
+EXEMPLO_DIAGRAMA = """
+@startuml TesteCli
+class Pessoa {
+  -nome: str
+  +get_nome(): str
+}
+@enduml
+"""
+
+def _cache_vazio(tmp_path, monkeypatch):
+    """Isola o teste dos caches de parse: memória esvaziada e cache em disco em tmp_path."""
+    monkeypatch.setattr(parser_module, "_CACHE_DIR", tmp_path / "cache")
+    clear_parse_cache()
+
+def _sem_parse(*args, **kwargs):
+    raise AssertionError("o diagrama deveria vir do cache")
+
+def test_convert_reutiliza_diagrama_em_memoria(tmp_path, monkeypatch):
+    _cache_vazio(tmp_path, monkeypatch)
+    entrada = tmp_path / "diagrama.plantuml"
+    entrada.write_text(EXEMPLO_DIAGRAMA, encoding="utf-8")
+    arquivos_py = main_cli.convert(str(entrada), "python", str(tmp_path / "saida"))
+    for arquivo in (tmp_path / "cache").glob("*.pkl"):
+        arquivo.unlink()
+    monkeypatch.setattr(PlantUMLParser, "_parse", _sem_parse)
+    arquivos_java = main_cli.convert(str(entrada), "java", str(tmp_path / "saida"))
+    assert any(a.endswith("pessoa.py") for a in arquivos_py)
+    assert any(a.endswith("Pessoa.java") for a in arquivos_java)
+
+
+def test_serve_responde_uma_linha_por_pedido(tmp_path, monkeypatch):
+    _cache_vazio(tmp_path, monkeypatch)
+    entrada = tmp_path / "diagrama.plantuml"
+    entrada.write_text(EXEMPLO_DIAGRAMA, encoding="utf-8")
+    ilegal = tmp_path / "ilegal.plantuml"
+    ilegal.write_text(EXEMPLO_DIAGRAMA.replace("class Pessoa {", "class Pessoa { $"), encoding="utf-8")
+    pedidos = io.StringIO(
+        json.dumps([str(entrada), "python", str(tmp_path / "saida")]) + "\n"
+        + json.dumps([str(tmp_path / "inexistente.plantuml"), "python", str(tmp_path / "saida")]) + "\n"
+        + json.dumps([str(ilegal), "python", str(tmp_path / "saida")]) + "\n"
+    )
+    saida = io.StringIO()
+    main_cli._serve(pedidos, saida)
+    # Cada linha do stdout é uma resposta JSON, mesmo com erros léxicos no diagrama
+    respostas = [json.loads(l) for l in saida.getvalue().splitlines()]
+    assert len(respostas) == 3
+    assert any(a.endswith("pessoa.py") for a in respostas[0]["arquivos"]) and respostas[0]["erros"] == []
+    assert respostas[1]["arquivos"] == [] and len(respostas[1]["erros"]) == 1
+    assert respostas[2]["arquivos"] and "Caractere ilegal '$'" in respostas[2]["erros"][0]
+
+def test_convert_usa_cache_de_parse(tmp_path, monkeypatch):
+    _cache_vazio(tmp_path, monkeypatch)
+    entrada = tmp_path / "diagrama.plantuml"
+    entrada.write_text(EXEMPLO_DIAGRAMA, encoding="utf-8")
+    main_cli.convert(str(entrada), "python", str(tmp_path / "saida"))
+    assert len(list((tmp_path / "cache").glob("*.pkl"))) == 1
+    clear_parse_cache()
+    monkeypatch.setattr(PlantUMLParser, "_parse", _sem_parse)
+    arquivos = main_cli.convert(str(entrada), "java", str(tmp_path / "saida"))
+    assert any(a.endswith("Pessoa.java") for a in arquivos)
+
+def test_convert_de_arquivo_vazio_nao_reaproveita_diagrama_anterior(tmp_path, monkeypatch):
+    _cache_vazio(tmp_path, monkeypatch)
+    entrada = tmp_path / "diagrama.plantuml"
+    entrada.write_text(EXEMPLO_DIAGRAMA, encoding="utf-8")
+    vazio = tmp_path / "vazio.plantuml"
+    vazio.write_text("", encoding="utf-8")
+    assert any(a.endswith("pessoa.py") for a in main_cli.convert(str(entrada), "python", str(tmp_path / "saida")))
+    arquivos = main_cli.convert(str(vazio), "python", str(tmp_path / "saida"))
+    assert not any(a.endswith("pessoa.py") for a in arquivos)
\ No newline at end of file
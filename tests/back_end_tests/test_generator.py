@@ -8,6 +8,7 @@ import os
 import shutil
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
 from back_end.python_generator.main_generator import gerar_codigo_python
+from back_end.plantuml_parser import parser as parser_module
 
 EXEMPLO_DIAGRAMA = """
 @startuml TesteGerador
@@ -18,7 +19,8 @@ class Pessoa {
 @enduml
 """
 
-def test_geracao_codigo(tmp_path):
+def test_geracao_codigo(tmp_path, monkeypatch):
+    monkeypatch.setattr(parser_module, "_CACHE_DIR", None)
     output_dir = tmp_path / "saida"
     output_dir.mkdir()
     gerar_codigo_python(EXEMPLO_DIAGRAMA, str(output_dir))
@@ -30,3 +32,20 @@ def test_geracao_codigo(tmp_path):
     conteudo = pessoa_py.read_text(encoding="utf-8")
     assert "class Pessoa" in conteudo
     assert "def get_nome" in conteudo
+
+
+def test_import_de_tipo_em_generico_aninhado(tmp_path, monkeypatch):
+    monkeypatch.setattr(parser_module, "_CACHE_DIR", None)
+    diagrama = """
+@startuml
+package loja {
+  class Pedido
+}
+class Cliente {
+  +historico: List<List<Pedido>>
+}
+@enduml
+"""
+    gerar_codigo_python(diagrama, str(tmp_path))
+    conteudo = next(tmp_path.iterdir()).joinpath("cliente.py").read_text(encoding="utf-8")
+    assert "from .loja.pedido import Pedido" in conteudo
\ No newline at end of file
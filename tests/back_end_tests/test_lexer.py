@@ -0,0 +1,62 @@
+"""
+Este arquivo testa o lexer do PlantUML, garantindo que a regex única
+produz os mesmos tokens (tipo, valor e linha) que as regras individuais.
+"""
+import sys
+import os
+import subprocess
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+from back_end.plantuml_parser.lexer import iter_tokens
+
+def test_tokens_basicos():
+    codigo = 'class Pessoa {\n  + {static} idade: int = -3\n}\nA <|-- B : "heranca"'
+    tokens = [(t.type, t.value, t.lineno) for t in iter_tokens(codigo)]
+    assert tokens == [
+        ('CLASS', 'class', 1), ('ID', 'Pessoa', 1), ('LBRACE', '{', 1),
+        ('VISIBILITY', '+', 2), ('STATIC_MODIFIER', 'static', 2), ('ID', 'idade', 2),
+        ('COLON', ':', 2), ('ID', 'int', 2), ('EQUALS', '=', 2), ('NUMBER', -3, 2),
+        ('RBRACE', '}', 3),
+        ('ID', 'A', 4), ('ARROW_INHERITANCE_LEFT', '<|--', 4), ('ID', 'B', 4),
+        ('COLON', ':', 4), ('QUOTED_STRING', 'heranca', 4),
+    ]
+
+def test_caractere_ilegal_e_comentario(capsys):
+    tokens = [t.type for t in iter_tokens("' comentario\nA $ B")]
+    assert tokens == ['ID', 'ID']
+    assert "Caractere ilegal '$' na linha 2" in capsys.readouterr().out
+
+def test_palavra_chave_apenas_como_identificador_inteiro():
+    tokens = [(t.type, t.value) for t in iter_tokens("class endereco\nend note")]
+    assert tokens == [('CLASS', 'class'), ('ID', 'endereco'), ('END', 'end'), ('NOTE', 'note')]
+
+def test_precedencia_sobre_id():
+    tokens = [t.type for t in iter_tokens("A o-- B\nhide empty\nordem")]
+    assert tokens == ['ID', 'ARROW_AGGREGATION_LEFT', 'ID', 'SKINPARAM_DIRECTIVE', 'ID']
+
+def test_diretiva_do_preprocessador():
+    tokens = [(t.type, t.value) for t in iter_tokens("!theme plain\nskinparam a b")]
+    assert tokens == [('BANG_DIRECTIVE', '!theme'), ('ID', 'plain'), ('SKINPARAM_DIRECTIVE', 'skinparam a b')]
+
+def test_string_com_aspas_escapadas():
+    tokens = [(t.type, t.value) for t in iter_tokens(r'"a\"b" "sem fim')]
+    assert tokens[0] == ('QUOTED_STRING', r'a\"b')
+    assert ('ID', 'sem') in tokens
+
+def test_linha_conta_todas_as_quebras():
+    tokens = [(t.value, t.lineno) for t in iter_tokens('A\n\n"x\ny"\nB', lineno=3)]
+    assert tokens == [('A', 3), ('x\ny', 5), ('B', 7)]
+
+def test_erros_acumulados_na_lista():
+    erros = []
+    tokens = [t.type for t in iter_tokens("A $\n% B", errors=erros)]
+    assert tokens == ['ID', 'ID']
+    assert erros == [(2, '$', 1), (4, '%', 2)]
+
+def test_lexer_funciona_sem_docstrings():
+    """As regras são constantes do módulo, então o lexer não depende de docstrings (python -OO)."""
+    raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+    codigo = ("from back_end.plantuml_parser.lexer import iter_tokens\n"
+              "print([t.type for t in iter_tokens('class A {\\n + x: int\\n}')])")
+    saida = subprocess.run([sys.executable, '-OO', '-c', codigo], cwd=raiz,
+                           capture_output=True, text=True, check=True).stdout
+    assert saida.strip() == "['CLASS', 'ID', 'LBRACE', 'VISIBILITY', 'ID', 'COLON', 'ID', 'RBRACE']"
\ No newline at end of file
@@ -6,7 +6,8 @@ import pytest
 import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
-from back_end.plantuml_parser.parser import PlantUMLParser
+from back_end.plantuml_parser import parser as parser_module
+from back_end.plantuml_parser.parser import PlantUMLParser, parse_cached, clear_parse_cache
 from back_end.plantuml_parser.data_structures.plantuml_classe import PlantUMLClasse
 
 EXEMPLO_DIAGRAMA = """
@@ -33,3 +34,64 @@ def test_parse_metodo_tipo():
     metodo = next((m for m in pessoa.metodos if m.nome == "get_nome"), None)
     assert metodo is not None
     assert metodo.tipo_retorno == "str"
+
+def test_estruturas_sem_dict_por_instancia():
+    parser = PlantUMLParser()
+    diagrama = parser.parse(EXEMPLO_DIAGRAMA)
+    pessoa = diagrama.elementos[0]
+    for obj in (parser, diagrama, pessoa, pessoa.atributos[0], pessoa.metodos[0]):
+        assert not hasattr(obj, "__dict__"), f"{type(obj).__name__} ainda possui __dict__"
+
+
+def test_colecoes_vazias_alocadas_no_primeiro_uso():
+    classe = PlantUMLClasse(nome="Vazia")
+    assert classe.interfaces_implementadas == () and classe.metodos == ()
+    classe.adicionar_interface("Serializavel")
+    assert classe.interfaces_implementadas == ["Serializavel"]
+    assert PlantUMLClasse(nome="Outra").interfaces_implementadas == ()
+
+def test_tokens_reaproveitados_para_o_mesmo_codigo(capsys):
+    codigo = EXEMPLO_DIAGRAMA.replace("class Pessoa {", "class Pessoa { $")
+    primeiro, segundo = PlantUMLParser(), PlantUMLParser()
+    primeiro.parse(codigo)
+    segundo.parse(codigo)
+    assert primeiro.tokens is segundo.tokens
+    # O erro léxico continua sendo reportado em cada parse
+    assert capsys.readouterr().out.count("Caractere ilegal '$'") == 2
+
+def test_parse_cached_devolve_copias_independentes(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(parser_module, "_CACHE_DIR", tmp_path)
+    clear_parse_cache()
+    codigo = EXEMPLO_DIAGRAMA.replace("class Pessoa {", "class Pessoa { $")
+    primeiro = parse_cached(codigo)
+    primeiro.elementos[0].nome = "Alterada"
+    segundo = parse_cached(codigo)
+    assert segundo.elementos[0].nome == "Pessoa"
+    assert capsys.readouterr().out.count("Caractere ilegal '$'") == 2
+
+def test_erros_lexicos_reportados_antes_do_erro_de_sintaxe(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(parser_module, "_CACHE_DIR", tmp_path)
+    clear_parse_cache()
+    codigo = "@startuml\nclass $ {\n@enduml\n"
+    for parse in (PlantUMLParser().parse, parse_cached):
+        with pytest.raises(SyntaxError):
+            parse(codigo)
+        assert "Caractere ilegal '$'" in capsys.readouterr().out
+
+def test_cache_em_disco_repete_erros_lexicos(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(parser_module, "_CACHE_DIR", tmp_path)
+    clear_parse_cache()
+    codigo = EXEMPLO_DIAGRAMA.replace("class Pessoa {", "class Pessoa { $")
+    parse_cached(codigo)
+    clear_parse_cache()
+    monkeypatch.setattr(PlantUMLParser, "_parse", None)
+    assert parse_cached(codigo).elementos[0].nome == "Pessoa"
+    assert capsys.readouterr().out.count("Caractere ilegal '$'") == 2
+
+def test_cache_em_disco_limitado(tmp_path, monkeypatch):
+    monkeypatch.setattr(parser_module, "_CACHE_DIR", tmp_path)
+    monkeypatch.setattr(parser_module, "_CACHE_MAX_ARQUIVOS", 2)
+    clear_parse_cache()
+    for nome in ("A", "B", "C"):
+        parse_cached(EXEMPLO_DIAGRAMA.replace("Pessoa", nome))
+    assert len(list(tmp_path.glob("*.pkl"))) == 2
\ No newline at end of file
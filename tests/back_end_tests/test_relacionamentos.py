@@ -42,3 +42,19 @@ def test_parse_relacionamento_associacao():
     assert rel is not None
     assert rel.label == "relaciona"
     assert rel.tipo == "associacao"
+
+
+def test_relacionamento_sem_dict_por_instancia():
+    rel = PlantUMLRelacionamento(origem="A", destino="B", tipo="associacao", cardinalidade_origem="1")
+    assert not hasattr(rel, "__dict__")
+    assert repr(rel) == "PlantUMLRelacionamento(origem='A', card_origem='1', destino='B', tipo='associacao')"
+
+def test_arestas_repetidas_compartilham_objeto():
+    parser = PlantUMLParser()
+    diagrama = parser.parse(BASE.format(rel='A -- B\nA -- B\nA *-- B'))
+    rels = diagrama.relacionamentos
+    assert len(rels) == 3
+    assert rels[0] is rels[1]
+    assert rels[2] is not rels[0]
+    # Cada parse começa com um diagrama novo, sem reaproveitar objetos anteriores
+    assert parser.parse(BASE.format(rel='A -- B')).relacionamentos[0] is not rels[0]
\ No newline at end of file